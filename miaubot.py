@@ -12,4 +12,10 @@ sys.path.insert(0, project_root)
 
 
 if __name__ == "__main__":
+    # Required by the process pool (--probe-workers) in frozen executables;
+    # plain runs skip loading multiprocessing unless the pool is used
+    if getattr(sys, "frozen", False):
+        import multiprocessing
+
+        multiprocessing.freeze_support()
     main()
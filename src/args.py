@@ -1,9 +1,11 @@
 import argparse
+from src.utils.profiling import STAGES
+from src.utils.scanner import DEFAULT_VIDEO_EXTENSIONS, parse_extensions
 
 
 def parse_arguments():
     parser = argparse.ArgumentParser(description="Process folders and video files.")
-    parser.add_argument("-i", "--input", required=True, help="Root folder to analyze")
+    parser.add_argument("-i", "--input", required=False, help="Root folder to analyze")
     parser.add_argument(
         "--rc-config",
         required=False,
@@ -41,4 +43,100 @@ def parse_arguments():
         required=False,
         help="Base remote path for report generation (e.g., 'gdrive:Anime')",
     )
+    parser.add_argument(
+        "--no-media-cache",
+        action="store_true",
+        help="Always re-parse files with MediaInfo instead of using the on-disk cache",
+    )
+    parser.add_argument(
+        "--clear-media-cache",
+        action="store_true",
+        help="Invalidate cached MediaInfo results (only under --input if given) and exit",
+    )
+    parser.add_argument(
+        "--probe-workers",
+        type=int,
+        default=1,
+        help="Number of processes running MediaInfo in folder mode "
+        "(file names are always parsed on a single thread)",
+    )
+    parser.add_argument(
+        "--upload-workers",
+        type=int,
+        default=1,
+        help="Number of concurrent rclone transfers in folder mode",
+    )
+    parser.add_argument(
+        "--upload-mode",
+        choices=["file", "batch"],
+        default="file",
+        help="Upload each file with its own rclone call, or batch them per destination root",
+    )
+    parser.add_argument(
+        "--extensions",
+        type=parse_extensions,
+        default=DEFAULT_VIDEO_EXTENSIONS,
+        help="Comma-separated video extensions to process in folder mode (default: mkv,mp4,avi)",
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        help="Glob of files or folders to skip in folder mode, repeatable (e.g. 'Extras/', '*sample*')",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="In folder mode, skip files that are unchanged since a previous run uploaded and reported them",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="In folder mode, continue the last interrupted run of the same folder and destination: skip files it already reported and only report the ones it already uploaded",
+    )
+    parser.add_argument(
+        "--precheck-remote",
+        action="store_true",
+        help="In folder mode with copy uploads, list the destination once with 'rclone lsjson -R' and skip files it already has with the same size",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="In folder mode, keep running and process files as they land in the folder",
+    )
+    parser.add_argument(
+        "--watch-settle",
+        type=float,
+        default=15.0,
+        metavar="SECONDS",
+        help="With --watch, seconds a file's size must stay unchanged before it is processed (default: 15)",
+    )
+    parser.add_argument(
+        "--fast-probe",
+        action="store_true",
+        help="Read only the file headers with MediaInfo (up to PROBE_BYTE_BUDGET bytes per file), for network mounts",
+    )
+    parser.add_argument(
+        "--rc-backend",
+        choices=["cli", "rcd"],
+        default="cli",
+        help="How uploads reach rclone: one process per transfer (cli) or jobs of a single 'rclone rcd' for the whole run (rcd)",
+    )
+    parser.add_argument(
+        "--telemetry-dir",
+        default=None,
+        metavar="DIR",
+        help="Write per-transfer telemetry (transfers.jsonl) and a Prometheus textfile (miaubot.prom) into this folder",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Time each stage (scan, parse, probe, upload, backdrop, report) and print p50/p95/max per stage and per file at exit",
+    )
+    parser.add_argument(
+        "--profile-stage",
+        choices=STAGES,
+        default=None,
+        help="Also run this stage under cProfile and write its stats to miaubot-<stage>.prof (implies --profile)",
+    )
     return parser.parse_args()
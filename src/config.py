@@ -1,11 +1,98 @@
 import os
-from dotenv import load_dotenv
+import sys
+from typing import Optional
 
-# Load environment variables
-load_dotenv()
+
+def _find_dotenv() -> Optional[str]:
+    """
+    Looks for a .env file the way python-dotenv's load_dotenv() does: from the
+    current folder in frozen executables, otherwise from this file's folder,
+    going up to the filesystem root.
+
+    :return: Path of the .env file, or None if there is none
+    """
+    directory = (
+        os.getcwd() if getattr(sys, "frozen", False) else os.path.dirname(__file__)
+    )
+    directory = os.path.abspath(directory)
+    while True:
+        path = os.path.join(directory, ".env")
+        if os.path.isfile(path):
+            return path
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+# Load environment variables. python-dotenv is only imported when there is a
+# .env file to read (deployments usually pass the variables directly)
+_DOTENV_PATH = _find_dotenv()
+if _DOTENV_PATH:
+    from dotenv import load_dotenv
+
+    load_dotenv(_DOTENV_PATH)
 
 # Environment variables
 TG_BOT_TOKEN: str = os.getenv("TG_BOT_TOKEN", "")
 TG_CHAT_ID: int = int(os.getenv("TG_CHAT_ID", "0"))
 TMDB_API_KEY: str = os.getenv("TMDB_API_KEY", "")
 TVDB_API_KEY: str = os.getenv("TVDB_API_KEY", "")
+# TVDB tokens are valid for a month: re-used (also across runs) for this many seconds
+TVDB_TOKEN_TTL: int = int(os.getenv("TVDB_TOKEN_TTL", str(25 * 24 * 3600)))
+
+# Local cache settings
+CACHE_DIR: str = os.getenv(
+    "MIAUBOT_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "miaubot")
+)
+MEDIA_CACHE_MAX_ENTRIES: int = int(os.getenv("MEDIA_CACHE_MAX_ENTRIES", "200000"))
+
+# Backdrop lookups: TTL for found artwork and for IDs without artwork (seconds, 0 disables)
+ARTWORK_CACHE_TTL: int = int(os.getenv("ARTWORK_CACHE_TTL", str(7 * 24 * 3600)))
+ARTWORK_CACHE_NEGATIVE_TTL: int = int(
+    os.getenv("ARTWORK_CACHE_NEGATIVE_TTL", str(24 * 3600))
+)
+# Backdrops looked up at the same time while a run is still parsing and uploading
+ARTWORK_PREFETCH_WORKERS: int = int(os.getenv("ARTWORK_PREFETCH_WORKERS", "4"))
+
+# HTTP client shared by TMDB, TVDB and Telegram
+HTTP_POOL_SIZE: int = int(os.getenv("HTTP_POOL_SIZE", "10"))
+HTTP_RETRIES: int = int(os.getenv("HTTP_RETRIES", "3"))
+HTTP_BACKOFF_FACTOR: float = float(os.getenv("HTTP_BACKOFF_FACTOR", "0.5"))
+
+# Backdrop relay to Telegram: images are buffered in memory up to the spool size
+# and spill to a temporary file above it; larger than the max size are not sent
+IMAGE_SPOOL_MAX_BYTES: int = int(
+    os.getenv("IMAGE_SPOOL_MAX_BYTES", str(4 * 1024 * 1024))
+)
+IMAGE_MAX_BYTES: int = int(os.getenv("IMAGE_MAX_BYTES", str(10 * 1024 * 1024)))
+
+# Telegram pacing: flood-wait retries, minimum seconds between messages to the
+# same chat (groups allow ~20 per minute), global messages per second (0 for no
+# global limit) and the number of reports that can wait in the background
+# dispatch queue
+TG_FLOOD_RETRIES: int = int(os.getenv("TG_FLOOD_RETRIES", "3"))
+TG_CHAT_INTERVAL: float = float(os.getenv("TG_CHAT_INTERVAL", "3.0"))
+TG_GLOBAL_RATE: float = float(os.getenv("TG_GLOBAL_RATE", "30"))
+TG_QUEUE_SIZE: int = int(os.getenv("TG_QUEUE_SIZE", "100"))
+
+# Watch mode: seconds between checks for new files (and between full rescans
+# when inotify is not available)
+WATCH_POLL_INTERVAL: float = float(os.getenv("WATCH_POLL_INTERVAL", "5.0"))
+
+# Folder processing: items that can wait between two pipeline stages
+# (scan -> parse -> probe -> upload -> report)
+PIPELINE_QUEUE_SIZE: int = int(os.getenv("PIPELINE_QUEUE_SIZE", "64"))
+
+# Fast MediaInfo probing (--fast-probe): bytes read per file at most, and
+# MediaInfo's parse speed (0 reads the least, 1 analyzes the whole file)
+PROBE_BYTE_BUDGET: int = int(os.getenv("PROBE_BYTE_BUDGET", str(16 * 1024 * 1024)))
+PROBE_PARSE_SPEED: float = float(os.getenv("PROBE_PARSE_SPEED", "0.0"))
+
+# rclone remote control (--rc-backend rcd): address of an already running
+# 'rclone rcd' (empty starts a private one per run), its credentials, and
+# seconds between job status checks
+RCLONE_RC_URL: str = os.getenv("RCLONE_RC_URL", "")
+RCLONE_RC_USER: str = os.getenv("RCLONE_RC_USER", "")
+RCLONE_RC_PASS: str = os.getenv("RCLONE_RC_PASS", "")
+RCLONE_RC_POLL_INTERVAL: float = float(os.getenv("RCLONE_RC_POLL_INTERVAL", "0.5"))
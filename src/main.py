@@ -1,33 +1,31 @@
+import argparse
 import os
 import sys
-from src.config import TG_BOT_TOKEN, TG_CHAT_ID
 from src.args import parse_arguments
-from src.utils.file_info import get_file_info
-from src.utils.media_info import get_media_info
-from src.utils.rclone import upload_files
-from src.utils.report import (
-    send_report,
-    get_backdrop_url,
-    format_report,
-    format_consolidated_report,
+from src.utils.profiling import PROFILER
+from src.utils.scanner import scan_video_files
+from functools import partial
+from itertools import chain
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    NoReturn,
+    Optional,
 )
-import shlex
-import tempfile
 
-args = parse_arguments()
-
-
-def get_episode_sort_key(episode_str: str) -> int:
-    """
-    Extract the first episode number from episode string for sorting.
-    
-    :param episode_str: Episode string like "01" or "04-06"
-    :return: Integer value of the first episode number
-    """
-    # Extract first episode number from format like "04-06" or just "01"
-    if "-" in episode_str:
-        return int(episode_str.split("-")[0])
-    return int(episode_str)
+# Everything else (config/.env, requests, pymediainfo, sqlite caches...) is
+# imported by the code path that needs it, so `--help`, an invalid path or a
+# failed upload don't pay for it: FileBot starts miaubot once per episode.
+if TYPE_CHECKING:
+    from src.utils.dispatch import ReportDispatcher
+    from src.utils.journal import RunJournal
+    from src.utils.pipeline import MediaPipeline
+    from src.utils.rclone import RemoteManifest
+    from src.utils.rclone_rc import RcloneRC
+    from src.utils.telemetry import TransferTelemetry
 
 
 def parse_upload_target(target: str):
@@ -45,132 +43,278 @@ def parse_upload_target(target: str):
         return "copy", parts[0].strip()
 
 
-def process_directory(directory: str, dry_run: bool = False) -> None:
+def build_remote_path(directory: str, file_path: str, remote_base: str) -> str:
     """
-    Processes a folder and its subfolders to analyze multimedia files.
-    Groups episodes by series and season for consolidated reports.
+    Builds the remote path of a file found while processing a folder.
+    The folder's own name is kept so the hierarchy is preserved in the remote.
+
+    :param directory: Path of the folder being processed
+    :param file_path: Path of the file inside the folder
+    :param remote_base: Base remote path (e.g., 'gdrive:Anime')
+    :return: Remote path of the file
+    """
+    # Handle root-relative paths correctly
+    relative_path = os.path.relpath(file_path, directory)
+    if relative_path.startswith("./"):
+        relative_path = relative_path[2:]  # Remove './' if present
 
+    # Get the name of the root folder (e.g. series or movie folder)
+    series_folder = os.path.basename(directory.rstrip("/"))
+
+    return os.path.join(remote_base, series_folder, relative_path).replace(os.sep, "/")
+
+
+def iter_file_batches(
+    args: argparse.Namespace, directory: str
+) -> Iterator[Optional[List[str]]]:
+    """
+    Yields the groups of files a folder run processes: a single None (scan the
+    whole folder once), or with --watch, each batch of files that finished
+    being written, until interrupted with Ctrl+C.
+
+    :param args: Parsed command line arguments
     :param directory: Path of the folder to process
-    :param dry_run: True to simulate the operations without executing them
+    :return: Iterator of file path lists (None meaning the whole folder)
     """
-    from collections import defaultdict
+    if not args.watch:
+        yield None
+        return
+
+    from src.config import WATCH_POLL_INTERVAL
+    from src.utils.watch import FolderWatcher
+
+    watcher = FolderWatcher(
+        directory,
+        args.extensions,
+        args.exclude,
+        settle_seconds=args.watch_settle,
+        poll_interval=WATCH_POLL_INTERVAL,
+    )
+    print(f"Watching {directory} for new files (Ctrl+C to stop)")
+    try:
+        yield from watcher.batches()
+    except KeyboardInterrupt:
+        print("Stopped watching.")
 
-    files_to_upload = []
-    episodes_by_series = defaultdict(lambda: defaultdict(list))
 
-    # Parse --rc-upload-to
+def stop_interrupted(journal: Optional["RunJournal"]) -> NoReturn:
+    """
+    Ends a folder run interrupted with Ctrl+C while it processed files. The
+    pipeline already stopped its stages; the run stays open in the journal.
+
+    :param journal: Journal of the run, or None in dry-run mode
+    """
+    if journal:
+        print("Run interrupted, run again with --resume to continue it.")
+    else:
+        print("Run interrupted.")
+    sys.exit(130)
+
+
+def build_single_file_remote_path(file_path: str, remote_base: str) -> str:
+    """
+    Builds the remote path of a file given directly as input, preserving the
+    structure from its series or movie folder (the one with a tvdbid/tmdbid tag).
+
+    :param file_path: Path of the file
+    :param remote_base: Base remote path (e.g., 'gdrive:Anime')
+    :return: Remote path of the file
+    """
+    # For series files, preserve directory structure from anime root
+    # Find series root folder (contains tvdbid)
+    path_parts = file_path.split(os.sep)
+    series_folder_idx = None
+    for i, part in enumerate(path_parts):
+        if "[tvdbid-" in part or "[tmdbid-" in part:
+            series_folder_idx = i
+            break
+
+    if series_folder_idx is not None:
+        # Preserve structure from series folder onward
+        relative_structure = os.sep.join(path_parts[series_folder_idx:])
+        return os.path.join(remote_base, relative_structure).replace(os.sep, "/")
+
+    # Fallback: just filename
+    return os.path.join(remote_base, os.path.basename(file_path)).replace(os.sep, "/")
+
+
+def open_journal(
+    args: argparse.Namespace, directory: str, destination: str
+) -> Optional["RunJournal"]:
+    """
+    Opens the write-ahead journal of a folder run, continuing the last
+    interrupted run of the same folder and destination with --resume.
+    Dry runs are not journaled.
+
+    :param args: Parsed command line arguments
+    :param directory: Path of the folder being processed
+    :param destination: Upload target or remote base of the run
+    :return: Journal of the run, or None in dry-run mode
+    """
+    if args.dry_run:
+        return None
+
+    from src.utils.journal import RunJournal
+
+    mode = "report" if args.report_only else "upload"
+    run_key = f"{mode}|{os.path.abspath(directory)}|{destination}"
+    return RunJournal(run_key, resume=args.resume)
+
+
+def open_manifest(
+    args: argparse.Namespace, directory: str
+) -> Optional["RemoteManifest"]:
+    """
+    Starts listing the destination of a folder run (--precheck-remote), once
+    for the whole run. Moves are not prechecked: they must still remove the
+    local files.
+
+    :param args: Parsed command line arguments
+    :param directory: Path of the folder being processed
+    :return: Listing of the destination, or None if not prechecking
+    """
     upload_to_operation, upload_to_remote = parse_upload_target(args.rc_upload_to)
+    if not args.precheck_remote or upload_to_operation not in ("copy", "copyto"):
+        return None
 
-    # Parse --rc-upload-all (if specified)
-    upload_all_operation, upload_all_remote = (
-        parse_upload_target(args.rc_upload_all) if args.rc_upload_all else (None, None)
+    from src.utils.rclone import RemoteManifest
+
+    # Listed in the background while the files are scanned and probed
+    series_folder = os.path.basename(directory.rstrip("/"))
+    return RemoteManifest(
+        os.path.join(upload_to_remote, series_folder).replace(os.sep, "/"),
+        args.rc_config,
+        args.rc_args,
     )
 
-    # First pass: collect all episodes and upload files
-    for root, _, files in os.walk(directory):
-        for file in files:
-            if file.endswith((".mkv", ".mp4", ".avi")):
-                file_path = os.path.join(root, file)
-                info = get_file_info(file_path)
-                if not info:
-                    print(f"Invalid file: {file}")
-                    continue
-
-                print(f"Processing file: {file}")
-
-                media_info = get_media_info(file_path)
-
-                # Handle root-relative paths correctly
-                relative_path = os.path.relpath(file_path, directory)
-                if relative_path.startswith("./"):
-                    relative_path = relative_path[2:]  # Remove './' if present
-
-                # Get the name of the root folder (e.g. series or movie folder)
-                series_folder = os.path.basename(directory.rstrip("/"))
-
-                # Build the remote path including the root folder so that the
-                # hierarchy is preserved in the destination remote.
-                remote_path = os.path.join(
-                    upload_to_remote, series_folder, relative_path
-                ).replace(os.sep, "/")
-                local_path = file_path
-
-                # Decide the correct rclone operation. For single files we should
-                # use "copyto" / "moveto" instead of "copy" / "move" so that the
-                # destination includes the full filename. If the user already
-                # specified a *to variant we respect it.
-                if os.path.isfile(local_path) and upload_to_operation in [
-                    "copy",
-                    "move",
-                ]:
-                    operation_to_use = (
-                        "copyto" if upload_to_operation == "copy" else "moveto"
-                    )
-                else:
-                    operation_to_use = upload_to_operation
 
-                # Upload files
-                success = upload_files(
-                    local_path=local_path,
-                    remote_path=remote_path,
-                    config_path=args.rc_config,
-                    extra_args=args.rc_args,
-                    dry_run=dry_run,
-                    operation=operation_to_use,
-                )
-                if not success:
-                    print(f"Error uploading file: {file}")
-                    continue
-
-                # Group episodes by series and season
-                if info["type"] == "series":
-                    series_key = f"{info['title']} ({info['year']})"
-                    season_key = info["season"]
-                    episodes_by_series[series_key][season_key].append(
-                        {
-                            "info": info,
-                            "media_info": media_info,
-                            "remote_path": remote_path,
-                            "episode": get_episode_sort_key(info["episode"]),
-                        }
-                    )
-                else:
-                    # For movies, send individual reports
-                    report = format_report(info, media_info, remote_path)
-                    backdrop_url = get_backdrop_url(
-                        info["id"], info["id_type"], info["type"]
-                    )
-                    send_report(TG_CHAT_ID, TG_BOT_TOKEN, report, backdrop_url, dry_run)
+def build_pipeline(
+    args: argparse.Namespace,
+    remote_path_for: Callable[[str], str],
+    upload_operation: Optional[str],
+    dry_run: bool,
+    dispatcher: Optional["ReportDispatcher"] = None,
+    group_series: bool = True,
+    rc_client: Optional["RcloneRC"] = None,
+    telemetry: Optional["TransferTelemetry"] = None,
+    journal: Optional["RunJournal"] = None,
+    manifest: Optional["RemoteManifest"] = None,
+    print_file_info: bool = False,
+) -> "MediaPipeline":
+    """
+    Builds the processing pipeline with the settings given in the arguments.
 
-                # Add file to the list of files to upload if upload all is specified
-                if args.rc_upload_all:
-                    files_to_upload.append(file_path)
+    :param args: Parsed command line arguments
+    :param remote_path_for: Builds the remote path of a local file
+    :param upload_operation: rclone operation, or None to only send reports
+    :param dry_run: True to simulate the operations without executing them
+    :param dispatcher: Background Telegram dispatcher (reports are sent inline if None)
+    :param group_series: True to send one report per season instead of per episode
+    :param rc_client: rclone rcd client to upload through (--rc-backend rcd)
+    :param telemetry: Transfer telemetry to record uploads in (--telemetry-dir)
+    :param journal: Journal of the folder run (see open_journal)
+    :param manifest: Listing of the destination to skip uploads against (--precheck-remote)
+    :param print_file_info: True to print the parsed details of each file
+    :return: Pipeline ready to run
+    """
+    from src.utils.pipeline import MediaPipeline
+
+    return MediaPipeline(
+        remote_path_for,
+        upload_operation=upload_operation,
+        config_path=args.rc_config,
+        extra_args=args.rc_args,
+        dry_run=dry_run,
+        dispatcher=dispatcher,
+        probe_workers=args.probe_workers,
+        upload_workers=args.upload_workers,
+        upload_mode=args.upload_mode,
+        use_cache=not args.no_media_cache,
+        fast_probe=args.fast_probe,
+        incremental=args.incremental,
+        group_series=group_series,
+        rc_client=rc_client,
+        telemetry=telemetry,
+        journal=journal,
+        manifest=manifest,
+        print_file_info=print_file_info,
+    )
 
-    # Second pass: generate consolidated reports for series
-    for series_name, seasons in episodes_by_series.items():
-        for season_num, episodes in seasons.items():
-            # Sort episodes by episode number
-            episodes.sort(key=lambda x: x["episode"])
 
-            # Use first episode's info as base
-            base_info = episodes[0]["info"]
-            base_remote_path = episodes[0]["remote_path"]
+def with_pending_reports(
+    file_paths: Iterable[str], journal: Optional["RunJournal"]
+) -> Iterable[str]:
+    """
+    Adds the files a resumed run uploaded (and moved away) but did not report.
+
+    :param file_paths: Files found in the folder
+    :param journal: Journal of the folder run, if any
+    :return: Files to process
+    """
+    if journal is None:
+        return file_paths
+    return chain(file_paths, journal.take_pending_reports())
+
+
+def process_directory(
+    args: argparse.Namespace,
+    directory: str,
+    dry_run: bool = False,
+    dispatcher: Optional["ReportDispatcher"] = None,
+    file_paths: Optional[Iterable[str]] = None,
+    rc_client: Optional["RcloneRC"] = None,
+    telemetry: Optional["TransferTelemetry"] = None,
+    journal: Optional["RunJournal"] = None,
+    manifest: Optional["RemoteManifest"] = None,
+) -> None:
+    """
+    Processes a folder and its subfolders to analyze multimedia files.
+    Groups episodes by series and season for consolidated reports.
 
-            # Generate consolidated report
-            from src.utils.report import format_consolidated_report
+    :param args: Parsed command line arguments
+    :param directory: Path of the folder to process
+    :param dry_run: True to simulate the operations without executing them
+    :param dispatcher: Background Telegram dispatcher (reports are sent inline if None)
+    :param file_paths: Files of the folder to process (None scans the whole folder)
+    :param rc_client: rclone rcd client to upload through (--rc-backend rcd)
+    :param telemetry: Transfer telemetry to record uploads in (--telemetry-dir)
+    :param journal: Journal of the folder run (see open_journal)
+    :param manifest: Listing of the destination (see open_manifest)
+    """
+    # Parse --rc-upload-to
+    upload_to_operation, upload_to_remote = parse_upload_target(args.rc_upload_to)
 
-            report = format_consolidated_report(episodes, base_remote_path)
+    # Parse --rc-upload-all (if specified)
+    upload_all_operation, upload_all_remote = (
+        parse_upload_target(args.rc_upload_all) if args.rc_upload_all else (None, None)
+    )
 
-            # Get backdrop URL
-            backdrop_url = get_backdrop_url(
-                base_info["id"], base_info["id_type"], base_info["type"]
-            )
+    if file_paths is None:
+        file_paths = PROFILER.iterate(
+            "scan", scan_video_files(directory, args.extensions, args.exclude)
+        )
+
+    pipeline = build_pipeline(
+        args,
+        partial(build_remote_path, directory, remote_base=upload_to_remote),
+        upload_to_operation,
+        dry_run,
+        dispatcher,
+        rc_client=rc_client,
+        telemetry=telemetry,
+        journal=journal,
+        manifest=manifest,
+    )
+    file_paths = with_pending_reports(file_paths, journal)
 
-            # Send consolidated report to Telegram
-            send_report(TG_CHAT_ID, TG_BOT_TOKEN, report, backdrop_url, dry_run)
+    files_to_upload = pipeline.run(file_paths)["processed"]
 
     # If upload all files is specified, upload them after processing the folder
     if upload_all_remote and files_to_upload:
+        import shlex
+        import tempfile
+        from src.utils.rclone import upload_files
+
         relative_files_to_upload = [
             os.path.relpath(file, start=directory).lstrip("./")
             for file in files_to_upload
@@ -186,115 +330,128 @@ def process_directory(directory: str, dry_run: bool = False) -> None:
             extra_args_with_filter = (
                 args.rc_args + f" --files-from {shlex.quote(files_from_path)}"
             )
-            upload_files(
-                local_path=directory,
-                remote_path=upload_all_remote,
-                config_path=args.rc_config,
-                extra_args=extra_args_with_filter,
-                dry_run=dry_run,
-                operation=upload_all_operation,
-            )
+            with PROFILER.stage("upload"):
+                upload_files(
+                    local_path=directory,
+                    remote_path=upload_all_remote,
+                    config_path=args.rc_config,
+                    extra_args=extra_args_with_filter,
+                    dry_run=dry_run,
+                    operation=upload_all_operation,
+                    telemetry=telemetry,
+                )
         finally:
             os.remove(files_from_path)
 
 
 def process_directory_report_only(
-    directory: str, remote_base: str, dry_run: bool = False
+    args: argparse.Namespace,
+    directory: str,
+    remote_base: str,
+    dry_run: bool = False,
+    dispatcher: Optional["ReportDispatcher"] = None,
+    file_paths: Optional[Iterable[str]] = None,
+    journal: Optional["RunJournal"] = None,
 ) -> None:
     """
     Processes a folder to generate reports for existing files without uploading.
     Groups episodes by series and season for consolidated reports.
 
+    :param args: Parsed command line arguments
     :param directory: Path of the local folder to analyze (e.g., /mnt/gdrive/Anime/Series/)
     :param remote_base: Base remote path for reports (e.g., 'gdrive:Anime')
     :param dry_run: True to simulate the operations without sending reports
+    :param dispatcher: Background Telegram dispatcher (reports are sent inline if None)
+    :param file_paths: Files of the folder to process (None scans the whole folder)
+    :param journal: Journal of the folder run (see open_journal)
     """
-    from collections import defaultdict
-
-    episodes_by_series = defaultdict(lambda: defaultdict(list))
-
-    # Process all video files in the directory
-    for root, _, files in os.walk(directory):
-        for file in files:
-            if file.endswith((".mkv", ".mp4", ".avi")):
-                file_path = os.path.join(root, file)
-                info = get_file_info(file_path)
-                if not info:
-                    print(f"Invalid file: {file}")
-                    continue
-
-                print(f"Processing file: {file}")
-
-                media_info = get_media_info(file_path)
-
-                # Calculate relative path from the base directory
-                relative_path = os.path.relpath(file_path, directory)
-                if relative_path.startswith("./"):
-                    relative_path = relative_path[2:]  # Remove './' if present
-
-                # Get series folder name (last part of directory path)
-                series_folder = os.path.basename(directory.rstrip("/"))
-
-                # Construct remote path including series folder
-                remote_path = os.path.join(
-                    remote_base, series_folder, relative_path
-                ).replace(os.sep, "/")
-
-                # Group episodes by series and season
-                if info["type"] == "series":
-                    series_key = f"{info['title']} ({info['year']})"
-                    season_key = info["season"]
-                    episodes_by_series[series_key][season_key].append(
-                        {
-                            "info": info,
-                            "media_info": media_info,
-                            "remote_path": remote_path,
-                            "episode": get_episode_sort_key(info["episode"]),
-                        }
-                    )
-                else:
-                    # For movies, send individual reports
-                    report = format_report(info, media_info, remote_path)
-                    backdrop_url = get_backdrop_url(
-                        info["id"], info["id_type"], info["type"]
-                    )
-                    send_report(TG_CHAT_ID, TG_BOT_TOKEN, report, backdrop_url, dry_run)
-
-    # Generate consolidated reports for series
-    for series_name, seasons in episodes_by_series.items():
-        for season_num, episodes in seasons.items():
-            # Sort episodes by episode number
-            episodes.sort(key=lambda x: x["episode"])
+    if file_paths is None:
+        file_paths = PROFILER.iterate(
+            "scan", scan_video_files(directory, args.extensions, args.exclude)
+        )
+
+    pipeline = build_pipeline(
+        args,
+        partial(build_remote_path, directory, remote_base=remote_base),
+        None,
+        dry_run,
+        dispatcher,
+        journal=journal,
+    )
+    pipeline.run(with_pending_reports(file_paths, journal))
 
-            # Use first episode's info as base
-            base_info = episodes[0]["info"]
-            base_remote_path = episodes[0]["remote_path"]
 
-            # Generate consolidated report
-            report = format_consolidated_report(episodes, base_remote_path)
+def process_file(
+    args: argparse.Namespace,
+    file_path: str,
+    remote_base: str,
+    upload_operation: Optional[str],
+    dry_run: bool,
+    rc_client: Optional["RcloneRC"] = None,
+    telemetry: Optional["TransferTelemetry"] = None,
+) -> None:
+    """
+    Processes a single file: uploads it (unless upload_operation is None) and
+    sends its report. Exits with an error if the file is invalid or the upload fails.
 
-            # Get backdrop URL
-            backdrop_url = get_backdrop_url(
-                base_info["id"], base_info["id_type"], base_info["type"]
-            )
+    :param args: Parsed command line arguments
+    :param file_path: Path of the file
+    :param remote_base: Base remote path (e.g., 'gdrive:Anime')
+    :param upload_operation: rclone operation, or None to only send the report
+    :param dry_run: True to simulate the operations without executing them
+    :param rc_client: rclone rcd client to upload through (--rc-backend rcd)
+    :param telemetry: Transfer telemetry to record uploads in (--telemetry-dir)
+    """
+    pipeline = build_pipeline(
+        args,
+        partial(build_single_file_remote_path, remote_base=remote_base),
+        upload_operation,
+        dry_run,
+        group_series=False,
+        rc_client=rc_client,
+        telemetry=telemetry,
+        print_file_info=True,
+    )
+    results = pipeline.run([file_path])
 
-            # Send consolidated report to Telegram
-            send_report(TG_CHAT_ID, TG_BOT_TOKEN, report, backdrop_url, dry_run)
+    if results["invalid"]:
+        print("Invalid file name format.")
+        print(f"File that failed: {file_path}")
+        sys.exit(1)
+    if results["failed"]:
+        sys.exit(1)
 
 
-def main() -> None:
+def run(args: argparse.Namespace) -> None:
     """
-    Main entry point. Processes the folder or file specified in the arguments.
+    Processes the folder or file specified in the arguments.
+
+    :param args: Parsed command line arguments
     """
+    if args.clear_media_cache:
+        from src.utils.media_cache import clear_media_cache
+
+        removed = clear_media_cache(args.input)
+        print(f"Removed {removed} cached MediaInfo entries.")
+        return
+
     # Determine if input is a directory or a single file
     input_path = args.input
 
+    if not input_path:
+        print("Error: --input is required.")
+        sys.exit(1)
+
     if not os.path.exists(input_path):
         print(f"Error: The path '{input_path}' does not exist.")
         sys.exit(1)
 
     is_directory = os.path.isdir(input_path)
 
+    if args.watch and not is_directory:
+        print("Error: --watch requires a folder as --input.")
+        sys.exit(1)
+
     # For directory paths we normalise with a trailing slash (used elsewhere)
     folder_path = input_path.rstrip("/") + "/" if is_directory else input_path
 
@@ -305,76 +462,36 @@ def main() -> None:
             sys.exit(1)
 
         if is_directory:
+            from src.config import TG_BOT_TOKEN
+            from src.utils.dispatch import ReportDispatcher
+
             print(f"Running in report-only mode for: {folder_path}")
             print(f"Remote base path: {args.remote_base}")
-            process_directory_report_only(
-                folder_path, args.remote_base, dry_run=args.dry_run
-            )
+            journal = open_journal(args, folder_path, args.remote_base)
+            dispatcher = ReportDispatcher(TG_BOT_TOKEN, dry_run=args.dry_run)
+            try:
+                for file_paths in iter_file_batches(args, folder_path):
+                    process_directory_report_only(
+                        args,
+                        folder_path,
+                        args.remote_base,
+                        dry_run=args.dry_run,
+                        dispatcher=dispatcher,
+                        file_paths=file_paths,
+                        journal=journal,
+                    )
+                    if journal and args.watch:
+                        journal.forget_reported()
+            except KeyboardInterrupt:
+                stop_interrupted(journal)
+            finally:
+                dispatcher.close()
+            # Only reached if the run was not interrupted
+            if journal:
+                journal.finish()
         else:
             # Single file report
-            info = get_file_info(input_path)
-            if not info:
-                print("Invalid file name format.")
-                print(f"File that failed: {input_path}")
-                sys.exit(1)
-
-            # Parse upload target
-            upload_to_operation, upload_to_remote = parse_upload_target(
-                args.rc_upload_to
-            )
-
-            print(f"Processing file: {os.path.basename(input_path)}")
-            print(f"File info parsed: {info}")
-
-            media_info = get_media_info(input_path)
-
-            # For series files, preserve directory structure from anime root
-            # Find series root folder (contains tvdbid)
-            path_parts = input_path.split(os.sep)
-            series_folder_idx = None
-            for i, part in enumerate(path_parts):
-                if "[tvdbid-" in part or "[tmdbid-" in part:
-                    series_folder_idx = i
-                    break
-
-            if series_folder_idx is not None:
-                # Preserve structure from series folder onward
-                relative_structure = os.sep.join(path_parts[series_folder_idx:])
-                remote_path = os.path.join(
-                    upload_to_remote, relative_structure
-                ).replace(os.sep, "/")
-            else:
-                # Fallback: just filename
-                remote_path = os.path.join(
-                    upload_to_remote, os.path.basename(input_path)
-                ).replace(os.sep, "/")
-
-            # Use copyto/moveto for single files
-            operation = (
-                "copyto"
-                if upload_to_operation == "copy"
-                else (
-                    "moveto" if upload_to_operation == "move" else upload_to_operation
-                )
-            )
-
-            success = upload_files(
-                local_path=input_path,
-                remote_path=remote_path,
-                config_path=args.rc_config,
-                extra_args=args.rc_args,
-                dry_run=args.dry_run,
-                operation=operation,
-            )
-
-            if not success:
-                print(f"Error uploading file: {os.path.basename(input_path)}")
-                sys.exit(1)
-
-            # Send report
-            report = format_report(info, media_info, remote_path)
-            backdrop_url = get_backdrop_url(info["id"], info["id_type"], info["type"])
-            send_report(TG_CHAT_ID, TG_BOT_TOKEN, report, backdrop_url, args.dry_run)
+            process_file(args, input_path, args.remote_base, None, args.dry_run)
 
     else:
         # Standard mode with file upload
@@ -388,75 +505,93 @@ def main() -> None:
                 f"Error: The rclone configuration file '{args.rc_config}' does not exist."
             )
             sys.exit(1)
-        if is_directory:
-            print(f"Running in upload mode for: {folder_path}")
-            process_directory(folder_path, dry_run=args.dry_run)
-        else:
-            # Single file upload
-            print(f"Single file upload mode for: {input_path}")
-            info = get_file_info(input_path)
-            if not info:
-                print("Invalid file name format.")
-                print(f"File that failed: {input_path}")
-                sys.exit(1)
-
-            # Parse upload target
-            upload_to_operation, upload_to_remote = parse_upload_target(
-                args.rc_upload_to
-            )
-
-            print(f"Processing file: {os.path.basename(input_path)}")
-            print(f"File info parsed: {info}")
-
-            media_info = get_media_info(input_path)
-
-            # For series files, preserve directory structure from anime root
-            # Find series root folder (contains tvdbid)
-            path_parts = input_path.split(os.sep)
-            series_folder_idx = None
-            for i, part in enumerate(path_parts):
-                if "[tvdbid-" in part or "[tmdbid-" in part:
-                    series_folder_idx = i
-                    break
-
-            if series_folder_idx is not None:
-                # Preserve structure from series folder onward
-                relative_structure = os.sep.join(path_parts[series_folder_idx:])
-                remote_path = os.path.join(
-                    upload_to_remote, relative_structure
-                ).replace(os.sep, "/")
+        operation = parse_upload_target(args.rc_upload_to)[0]
+        if args.precheck_remote and operation not in ("copy", "copyto"):
+            # A move must still run to remove the local file
+            print("--precheck-remote only applies to copy uploads, ignoring it.")
+        rc_client = None
+        if args.rc_backend == "rcd":
+            from src.utils.rclone_rc import RcloneRC
+
+            # One rclone rcd serves every transfer of the run
+            rc_client = RcloneRC(args.rc_config, args.rc_args)
+        telemetry = None
+        if args.telemetry_dir:
+            from src.utils.telemetry import TransferTelemetry
+
+            telemetry = TransferTelemetry()
+        try:
+            if is_directory:
+                from src.config import TG_BOT_TOKEN
+                from src.utils.dispatch import ReportDispatcher
+
+                print(f"Running in upload mode for: {folder_path}")
+                journal = open_journal(args, folder_path, args.rc_upload_to)
+                manifest = open_manifest(args, folder_path)
+                dispatcher = ReportDispatcher(TG_BOT_TOKEN, dry_run=args.dry_run)
+                try:
+                    for file_paths in iter_file_batches(args, folder_path):
+                        process_directory(
+                            args,
+                            folder_path,
+                            dry_run=args.dry_run,
+                            dispatcher=dispatcher,
+                            file_paths=file_paths,
+                            rc_client=rc_client,
+                            telemetry=telemetry,
+                            journal=journal,
+                            manifest=manifest,
+                        )
+                        if journal and args.watch:
+                            journal.forget_reported()
+                        if telemetry:
+                            telemetry.write(args.telemetry_dir)
+                except KeyboardInterrupt:
+                    stop_interrupted(journal)
+                finally:
+                    dispatcher.close()
+                # Only reached if the run was not interrupted
+                if journal:
+                    journal.finish()
             else:
-                # Fallback: just filename
-                remote_path = os.path.join(
-                    upload_to_remote, os.path.basename(input_path)
-                ).replace(os.sep, "/")
-
-            # Use copyto/moveto for single files
-            operation = (
-                "copyto"
-                if upload_to_operation == "copy"
-                else (
-                    "moveto" if upload_to_operation == "move" else upload_to_operation
+                # Single file upload
+                print(f"Single file upload mode for: {input_path}")
+                upload_to_operation, upload_to_remote = parse_upload_target(
+                    args.rc_upload_to
                 )
-            )
-
-            success = upload_files(
-                local_path=input_path,
-                remote_path=remote_path,
-                config_path=args.rc_config,
-                extra_args=args.rc_args,
-                dry_run=args.dry_run,
-                operation=operation,
-            )
+                process_file(
+                    args,
+                    input_path,
+                    upload_to_remote,
+                    upload_to_operation,
+                    args.dry_run,
+                    rc_client=rc_client,
+                    telemetry=telemetry,
+                )
+        finally:
+            if rc_client:
+                rc_client.close()
+            if telemetry:
+                telemetry.write(args.telemetry_dir)
 
-            if not success:
-                print(f"Error uploading file: {os.path.basename(input_path)}")
-                sys.exit(1)
 
-            # Send report
-            report = format_report(info, media_info, remote_path)
-            backdrop_url = get_backdrop_url(info["id"], info["id_type"], info["type"])
-            send_report(TG_CHAT_ID, TG_BOT_TOKEN, report, backdrop_url, args.dry_run)
+def main() -> None:
+    """
+    Main entry point. Runs miaubot and, with --profile, prints where the time went.
+    """
+    args = parse_arguments()
+    if args.profile or args.profile_stage:
+        PROFILER.enable(args.profile_stage)
+
+    try:
+        run(args)
+    finally:
+        if PROFILER.enabled:
+            print(PROFILER.report())
+            if args.profile_stage:
+                dump_path = f"miaubot-{args.profile_stage}.prof"
+                PROFILER.dump_cprofile(dump_path)
+                print(f"cProfile stats of the {args.profile_stage} stage: {dump_path}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,160 @@
+import sqlite3
+import threading
+import time
+from typing import Optional, Tuple
+from src.config import ARTWORK_CACHE_NEGATIVE_TTL, ARTWORK_CACHE_TTL
+from src.utils.cache_db import get_cache_connection
+
+_DB_FILE_NAME = "artwork.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS backdrops (
+    id_type TEXT NOT NULL,
+    content_id TEXT NOT NULL,
+    content_type TEXT NOT NULL,
+    url TEXT,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (id_type, content_id, content_type)
+);
+CREATE TABLE IF NOT EXISTS strategies (
+    id_type TEXT NOT NULL,
+    content_id TEXT NOT NULL,
+    content_type TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (id_type, content_id, content_type)
+);
+"""
+
+# Backdrops are looked up from several prefetch threads sharing the connection
+_LOCK = threading.Lock()
+
+
+def get_cached_backdrop(
+    id_type: str, content_id: str, content_type: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Looks up a backdrop URL resolved by a previous lookup.
+    Entries without artwork (url NULL) expire after ARTWORK_CACHE_NEGATIVE_TTL,
+    all other entries after ARTWORK_CACHE_TTL.
+
+    :param id_type: The type of ID, either "tmdbid" or "tvdbid".
+    :param content_id: The content's ID.
+    :param content_type: The type of content, either "movie" or "series".
+    :return: Tuple (hit, url); url is None for a cached "no artwork" result.
+    """
+    if ARTWORK_CACHE_TTL <= 0:
+        return False, None
+
+    connection = get_cache_connection(_DB_FILE_NAME, _SCHEMA)
+    if connection is None:
+        return False, None
+
+    try:
+        with _LOCK:
+            row = connection.execute(
+                "SELECT url, fetched_at FROM backdrops "
+                "WHERE id_type = ? AND content_id = ? AND content_type = ?",
+                (id_type, str(content_id), content_type),
+            ).fetchone()
+    except sqlite3.Error as e:
+        print(f"Error reading artwork cache: {e}")
+        return False, None
+
+    if not row:
+        return False, None
+
+    url, fetched_at = row
+    ttl = ARTWORK_CACHE_TTL if url else ARTWORK_CACHE_NEGATIVE_TTL
+    if time.time() - fetched_at > ttl:
+        return False, None
+    return True, url
+
+
+def store_backdrop(
+    id_type: str, content_id: str, content_type: str, url: Optional[str]
+) -> None:
+    """
+    Stores the result of a backdrop lookup, including lookups without artwork.
+
+    :param id_type: The type of ID, either "tmdbid" or "tvdbid".
+    :param content_id: The content's ID.
+    :param content_type: The type of content, either "movie" or "series".
+    :param url: Backdrop URL, or None if the content has no artwork.
+    """
+    if ARTWORK_CACHE_TTL <= 0:
+        return
+
+    connection = get_cache_connection(_DB_FILE_NAME, _SCHEMA)
+    if connection is None:
+        return
+
+    try:
+        with _LOCK:
+            connection.execute(
+                "INSERT OR REPLACE INTO backdrops "
+                "(id_type, content_id, content_type, url, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (id_type, str(content_id), content_type, url, time.time()),
+            )
+            connection.commit()
+    except sqlite3.Error as e:
+        print(f"Error writing artwork cache: {e}")
+
+
+def get_artwork_strategy(
+    id_type: str, content_id: str, content_type: str
+) -> Optional[str]:
+    """
+    Looks up which kind of artwork the last lookup of a title found, so the
+    next one can ask for that kind directly. Kept whatever ARTWORK_CACHE_TTL
+    is: it only narrows the request, the artwork itself is always fetched.
+
+    :param id_type: The type of ID, either "tmdbid" or "tvdbid".
+    :param content_id: The content's ID.
+    :param content_type: The type of content, either "movie" or "series".
+    :return: Strategy name (e.g. "backdrop"), or None if unknown.
+    """
+    connection = get_cache_connection(_DB_FILE_NAME, _SCHEMA)
+    if connection is None:
+        return None
+
+    try:
+        with _LOCK:
+            row = connection.execute(
+                "SELECT strategy FROM strategies "
+                "WHERE id_type = ? AND content_id = ? AND content_type = ?",
+                (id_type, str(content_id), content_type),
+            ).fetchone()
+    except sqlite3.Error as e:
+        print(f"Error reading artwork cache: {e}")
+        return None
+    return row[0] if row else None
+
+
+def store_artwork_strategy(
+    id_type: str, content_id: str, content_type: str, strategy: str
+) -> None:
+    """
+    Remembers which kind of artwork a lookup found.
+
+    :param id_type: The type of ID, either "tmdbid" or "tvdbid".
+    :param content_id: The content's ID.
+    :param content_type: The type of content, either "movie" or "series".
+    :param strategy: Strategy name (e.g. "backdrop").
+    """
+    connection = get_cache_connection(_DB_FILE_NAME, _SCHEMA)
+    if connection is None:
+        return
+
+    try:
+        with _LOCK:
+            connection.execute(
+                "INSERT OR REPLACE INTO strategies "
+                "(id_type, content_id, content_type, strategy, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (id_type, str(content_id), content_type, strategy, time.time()),
+            )
+            connection.commit()
+    except sqlite3.Error as e:
+        print(f"Error writing artwork cache: {e}")
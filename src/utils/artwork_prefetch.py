@@ -0,0 +1,90 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+from src.config import ARTWORK_PREFETCH_WORKERS
+from src.utils.profiling import PROFILER
+from src.utils.report import get_backdrop_url
+
+# (content_id, id_type, content_type)
+_Key = Tuple[str, str, str]
+
+
+def fetch_backdrop(content_id: str, id_type: str, content_type: str) -> Optional[str]:
+    """
+    Looks up a backdrop, timed as the "backdrop" stage of --profile.
+
+    :param content_id: The content's ID.
+    :param id_type: The type of ID, either "tmdbid" or "tvdbid".
+    :param content_type: The type of content, either "movie" or "series".
+    :return: Backdrop URL, or None if there is none.
+    """
+    with PROFILER.stage("backdrop"):
+        return get_backdrop_url(content_id, id_type, content_type)
+
+
+class ArtworkPrefetcher:
+    """
+    Resolves the backdrops of a run ahead of its reports.
+
+    Lookups start as soon as a file is parsed, on up to ARTWORK_PREFETCH_WORKERS
+    threads, and each distinct (id, id_type, content_type) is looked up only
+    once per run: the seasons of a series share a single lookup. By the time a
+    report is sent, its backdrop is usually resolved already.
+    """
+
+    def __init__(self, workers: int = ARTWORK_PREFETCH_WORKERS):
+        """
+        :param workers: Number of lookups running at the same time
+        """
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(1, workers), thread_name_prefix="artwork"
+        )
+        self._futures: Dict[_Key, Future] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def prefetch(self, content_id: str, id_type: str, content_type: str) -> None:
+        """
+        Starts the lookup of a backdrop, unless the run already started it.
+
+        :param content_id: The content's ID.
+        :param id_type: The type of ID, either "tmdbid" or "tvdbid".
+        :param content_type: The type of content, either "movie" or "series".
+        """
+        key = (str(content_id), id_type, content_type)
+        with self._lock:
+            if key in self._futures or self._closed:
+                return
+            self._futures[key] = self._pool.submit(fetch_backdrop, *key)
+
+    def get_backdrop_url(
+        self, content_id: str, id_type: str, content_type: str
+    ) -> Optional[str]:
+        """
+        Waits for the backdrop lookup of the content, starting it if needed.
+
+        :param content_id: The content's ID.
+        :param id_type: The type of ID, either "tmdbid" or "tvdbid".
+        :param content_type: The type of content, either "movie" or "series".
+        :return: Backdrop URL, or None if there is none.
+        """
+        self.prefetch(content_id, id_type, content_type)
+        future = self._futures.get((str(content_id), id_type, content_type))
+        if future is None:
+            # Not prefetched before close(): look it up right here
+            return fetch_backdrop(content_id, id_type, content_type)
+
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"Error fetching backdrop: {e}")
+            return None
+
+    def close(self) -> None:
+        """
+        Stops accepting lookups. Lookups already started still complete, so
+        reports queued on the dispatcher can wait for them.
+        """
+        with self._lock:
+            self._closed = True
+        self._pool.shutdown(wait=False)
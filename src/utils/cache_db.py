@@ -0,0 +1,36 @@
+import os
+import sqlite3
+from typing import Dict, Optional, Tuple
+from src.config import CACHE_DIR
+
+# Connections are opened lazily and re-opened after a fork (process pools)
+_CONNECTIONS: Dict[str, Tuple[int, sqlite3.Connection]] = {}
+
+
+def get_cache_connection(file_name: str, schema: str) -> Optional[sqlite3.Connection]:
+    """
+    Opens (or re-uses) a SQLite database stored in the cache directory.
+
+    :param file_name: Name of the database file inside CACHE_DIR
+    :param schema: SQL script creating the tables and indexes if they do not exist
+    :return: SQLite connection, or None if the cache directory is not usable
+    """
+    cached = _CONNECTIONS.get(file_name)
+    if cached and cached[0] == os.getpid():
+        return cached[1]
+
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        connection = sqlite3.connect(
+            os.path.join(CACHE_DIR, file_name), timeout=30, check_same_thread=False
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(schema)
+        connection.commit()
+    except (OSError, sqlite3.Error) as e:
+        print(f"Cache {file_name} disabled: {e}")
+        return None
+
+    _CONNECTIONS[file_name] = (os.getpid(), connection)
+    return connection
@@ -0,0 +1,112 @@
+import queue
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+from src.config import TG_CHAT_INTERVAL, TG_GLOBAL_RATE, TG_QUEUE_SIZE
+from src.utils.profiling import PROFILER
+from src.utils.report import send_report
+
+# (chat_id, report, get_backdrop, on_sent)
+_Job = Tuple[int, str, Callable[[], Optional[str]], Optional[Callable[[], None]]]
+
+
+class ReportDispatcher:
+    """
+    Sends reports to Telegram from a background thread so scanning and
+    uploading are never blocked by Telegram round-trips.
+
+    Reports are sent in submission order, at most one every TG_CHAT_INTERVAL
+    seconds per chat and TG_GLOBAL_RATE per second overall (no global limit if
+    0). Flood-waits (429) are honored by send_report itself, which pauses the
+    whole queue.
+    """
+
+    def __init__(self, token: str, dry_run: bool = False):
+        """
+        :param token: Telegram bot token.
+        :param dry_run: True to simulate the sends (no pacing is applied).
+        """
+        self.token = token
+        self.dry_run = dry_run
+        self.sent = 0
+        self.failed = 0
+        self._queue: "queue.Queue[Optional[_Job]]" = queue.Queue(maxsize=TG_QUEUE_SIZE)
+        self._next_global = 0.0
+        self._next_per_chat: Dict[int, float] = {}
+        self._thread = threading.Thread(
+            target=self._run, name="report-dispatcher", daemon=True
+        )
+        self._thread.start()
+
+    def submit(
+        self,
+        chat_id: int,
+        report: str,
+        get_backdrop: Callable[[], Optional[str]],
+        on_sent: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """
+        Queues a report. The backdrop is resolved in the dispatcher thread.
+        Blocks only when TG_QUEUE_SIZE reports are already waiting.
+
+        :param chat_id: Telegram chat ID.
+        :param report: Report to send.
+        :param get_backdrop: Returns the backdrop URL of the report (or None).
+        :param on_sent: Called from the dispatcher thread once the report was sent.
+        """
+        self._queue.put((chat_id, report, get_backdrop, on_sent))
+
+    def close(self) -> None:
+        """
+        Waits until every queued report has been sent and prints a summary.
+        """
+        self._queue.put(None)
+        self._thread.join()
+        print(f"Reports sent: {self.sent}, failed: {self.failed}")
+
+    def _wait_for_slot(self, chat_id: int) -> None:
+        """
+        Sleeps until both the global and the per-chat rate limits allow a send.
+
+        :param chat_id: Telegram chat ID.
+        """
+        if self.dry_run:
+            return
+
+        next_allowed = max(self._next_global, self._next_per_chat.get(chat_id, 0.0))
+        delay = next_allowed - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+        now = time.monotonic()
+        # TG_GLOBAL_RATE <= 0 disables the global limit
+        self._next_global = now + 1.0 / TG_GLOBAL_RATE if TG_GLOBAL_RATE > 0 else now
+        self._next_per_chat[chat_id] = now + TG_CHAT_INTERVAL
+
+    def _run(self) -> None:
+        """
+        Worker loop: sends queued reports until the close() sentinel arrives.
+        """
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+
+            chat_id, report, get_backdrop, on_sent = job
+            try:
+                backdrop_url = get_backdrop()
+                self._wait_for_slot(chat_id)
+                with PROFILER.stage("report"):
+                    sent = send_report(
+                        chat_id, self.token, report, backdrop_url, self.dry_run
+                    )
+                if sent:
+                    self.sent += 1
+                    if on_sent:
+                        on_sent()
+                else:
+                    self.failed += 1
+            except Exception as e:
+                # Keep draining the queue whatever happens to a single report
+                print(f"Error dispatching report: {e}")
+                self.failed += 1
@@ -1,5 +1,7 @@
+import os
 import re
-from typing import Optional, Dict
+from typing import Dict, Iterable, List, Optional
+from src.utils.records import FileInfo
 
 # Regular expression pattern to match new anime structure
 # Format: "Title (Year) - S01E01 - 001 - [Quality Info] - Group.mkv"
@@ -74,7 +76,188 @@ def _detect_platform(qi: str) -> str:
     return "Unknown"
 
 
-def get_file_info(file_path: str) -> Optional[Dict[str, Optional[str]]]:
+# Pattern to extract the quality block and the resolution inside it
+QUALITY_PATTERN = r"\[([^\]]+)\]"
+RESOLUTION_PATTERN = r"(\d{3,4}p)"
+
+
+class FileInfoParser:
+    """
+    Filename parser with precompiled patterns.
+
+    The TVDB ID of every series folder is remembered, so the episodes of a
+    season only run FOLDER_PATTERN once. Use a single instance for a whole
+    run (or parse_many) to benefit from it.
+    """
+
+    def __init__(self):
+        self._file_re = re.compile(FILE_PATTERN)
+        self._ext_movie_re = re.compile(EXT_MOVIE_PATTERN)
+        self._old_file_re = re.compile(OLD_FILE_PATTERN)
+        self._folder_re = re.compile(FOLDER_PATTERN)
+        self._quality_re = re.compile(QUALITY_PATTERN)
+        self._resolution_re = re.compile(RESOLUTION_PATTERN)
+        self._folder_ids: Dict[str, Optional[str]] = {}
+
+    def _folder_tvdb_id(self, series_folder: str) -> Optional[str]:
+        """
+        Returns the TVDB ID of a series folder name, memoized per folder.
+
+        :param series_folder: Name of the series folder (e.g. "Title (2024) [tvdbid-123]")
+        :return: The TVDB ID, or None if the folder has no ID block
+        """
+        try:
+            return self._folder_ids[series_folder]
+        except KeyError:
+            folder_match = self._folder_re.search(series_folder)
+            tvdb_id = folder_match.group(1) if folder_match else None
+            self._folder_ids[series_folder] = tvdb_id
+            return tvdb_id
+
+    def _resolution(self, quality_info: str) -> str:
+        """
+        :param quality_info: Quality block of the file name (e.g. "1080p CR WEB-DL")
+        :return: The resolution (e.g. "1080p"), or "Unknown"
+        """
+        resolution_match = self._resolution_re.search(quality_info)
+        return resolution_match.group(1) if resolution_match else "Unknown"
+
+    def parse(self, file_path: str) -> Optional[FileInfo]:
+        """
+        Parses a single file path. See get_file_info for the returned fields.
+
+        :param file_path: The full file path to be analyzed.
+        :return: FileInfo with the extracted metadata, or None if no pattern matches.
+        """
+        folder_path, file_name = os.path.split(file_path)
+
+        # Try new anime structure first
+        match = self._file_re.match(file_name)
+        if match:
+            # Extract TVDB ID from parent folder
+            tvdb_id = self._folder_tvdb_id(
+                os.path.basename(os.path.dirname(folder_path))
+            )
+
+            if tvdb_id:
+                # Extract quality info from filename
+                quality_match = self._quality_re.search(file_name)
+                quality_info = quality_match.group(1) if quality_match else "Unknown"
+
+                # Handle both single and multi-episode formats
+                (
+                    title,
+                    year,
+                    season,
+                    episode_start,
+                    episode_end,  # None for single episodes
+                    absolute_start,
+                    absolute_end,  # None for single episodes
+                    extension,
+                ) = match.groups()
+
+                # For episode field, use range format if it's multi-episode
+                if episode_end:
+                    episode_display = f"{episode_start}-{episode_end}"
+                else:
+                    episode_display = episode_start
+
+                # For absolute episode number, use range format if available
+                if absolute_start and absolute_end:
+                    absolute_display = f"{absolute_start}-{absolute_end}"
+                elif absolute_start:
+                    absolute_display = absolute_start
+                else:
+                    absolute_display = None
+
+                return FileInfo(
+                    title=title,
+                    year=year,
+                    season=season,
+                    episode=episode_display,
+                    episode_number=absolute_display,
+                    resolution=self._resolution(quality_info),
+                    platform=_detect_platform(quality_info),
+                    id_type="tvdbid",
+                    id=tvdb_id,
+                    extension=extension,
+                    type="series",
+                    quality_info=quality_info,
+                )
+
+        # Extended movie format with ID before quality
+        match = self._ext_movie_re.match(file_name)
+        if match:
+            title, year, id_type, id_val, rest_info, extension = match.groups()
+
+            quality_info = rest_info or ""
+
+            return FileInfo(
+                title=title,
+                year=year,
+                season=None,
+                episode=None,
+                episode_number=None,
+                resolution=self._resolution(quality_info),
+                platform=_detect_platform(quality_info),
+                id_type=id_type,
+                id=id_val,
+                extension=extension,
+                type="movie",
+                quality_info=quality_info,
+            )
+
+        # Fallback to old format
+        match = self._old_file_re.match(file_name)
+        if not match:
+            return None
+
+        (
+            title,
+            year,
+            season,
+            episode,
+            resolution,
+            platform,
+            id_type,
+            id_val,
+            extension,
+        ) = match.groups()
+
+        # Determine if the file is a series based on the presence of season and episode
+        is_series = season is not None and episode is not None
+
+        # Return extracted metadata
+        return FileInfo(
+            title=title,
+            year=year,
+            season=season,  # None for movies
+            episode=episode,  # None for movies
+            episode_number=None,
+            resolution=resolution,
+            platform=platform,
+            id_type=id_type,  # Either "tmdbid" or "tvdbid"
+            id=id_val,  # The numeric ID value
+            extension=extension,
+            type="series" if is_series else "movie",
+            quality_info=f"{resolution} {platform}",
+        )
+
+    def parse_many(self, file_paths: Iterable[str]) -> List[Optional[FileInfo]]:
+        """
+        Parses several file paths, sharing the per-folder ID memo.
+
+        :param file_paths: File paths to be analyzed.
+        :return: One result per path, in the same order (None for non-matching files).
+        """
+        parse = self.parse
+        return [parse(file_path) for file_path in file_paths]
+
+
+_DEFAULT_PARSER = FileInfoParser()
+
+
+def get_file_info(file_path: str) -> Optional[FileInfo]:
     """
     Extracts metadata information from a file path following anime structure patterns.
     The function supports both new anime structure and old formats.
@@ -91,10 +274,11 @@ def get_file_info(file_path: str) -> Optional[Dict[str, Optional[str]]]:
         file_path (str): The full file path to be analyzed.
 
     Returns:
-        Optional[Dict[str, Optional[str]]]: A dictionary containing metadata extracted
-        from the file path if it matches any pattern, or None if no match is found.
+        Optional[FileInfo]: A record containing metadata extracted from the file
+        path if it matches any pattern, or None if no match is found. Fields can be
+        read as attributes or dict-style (info["title"]).
 
-        The returned dictionary includes:
+        The returned record includes:
             - "title" (str): The title of the series or movie.
             - "year" (str): The release year.
             - "season" (Optional[str]): The season number (None for movies).
@@ -108,115 +292,14 @@ def get_file_info(file_path: str) -> Optional[Dict[str, Optional[str]]]:
             - "type" (str): The type of content, either "series" or "movie".
             - "quality_info" (str): Additional quality information.
     """
-    import os
-
-    file_name = os.path.basename(file_path)
-    folder_path = os.path.dirname(file_path)
-
-    # Try new anime structure first
-    match = re.match(FILE_PATTERN, file_name)
-    if match:
-        # Extract TVDB ID from parent folder
-        folder_name = os.path.basename(os.path.dirname(folder_path))
-        folder_match = re.search(FOLDER_PATTERN, folder_name)
-
-        if folder_match:
-            tvdb_id = folder_match.group(1)
-            # Extract quality info from filename
-            quality_match = re.search(r"\[([^\]]+)\]", file_name)
-            quality_info = quality_match.group(1) if quality_match else "Unknown"
-
-            # Extract resolution from quality info
-            resolution_match = re.search(r"(\d{3,4}p)", quality_info)
-            resolution = resolution_match.group(1) if resolution_match else "Unknown"
-
-            # Detect platform using helper
-            platform = _detect_platform(quality_info)
-
-            # Handle both single and multi-episode formats
-            episode_start = match.group(4)
-            episode_end = match.group(5)  # None for single episodes
-            absolute_start = match.group(6)
-            absolute_end = match.group(7)  # None for single episodes
-            
-            # For episode field, use range format if it's multi-episode
-            if episode_end:
-                episode_display = f"{episode_start}-{episode_end}"
-            else:
-                episode_display = episode_start
-                
-            # For absolute episode number, use range format if available
-            if absolute_start and absolute_end:
-                absolute_display = f"{absolute_start}-{absolute_end}"
-            elif absolute_start:
-                absolute_display = absolute_start
-            else:
-                absolute_display = None
-
-            return {
-                "title": match.group(1),
-                "year": match.group(2),
-                "season": match.group(3),
-                "episode": episode_display,
-                "episode_number": absolute_display,
-                "resolution": resolution,
-                "platform": platform,
-                "id_type": "tvdbid",
-                "id": tvdb_id,
-                "extension": match.group(8),
-                "type": "series",
-                "quality_info": quality_info,
-            }
-
-    # Extended movie format with ID before quality
-    match = re.match(EXT_MOVIE_PATTERN, file_name)
-    if match:
-        title, year, id_type, id_val, rest_info, extension = match.groups()
-
-        quality_info = rest_info or ""
-
-        # Extract resolution
-        resolution_match = re.search(r"(\d{3,4}p)", quality_info)
-        resolution = resolution_match.group(1) if resolution_match else "Unknown"
-
-        # Detect platform using helper
-        platform = _detect_platform(quality_info)
-
-        return {
-            "title": title,
-            "year": year,
-            "season": None,
-            "episode": None,
-            "episode_number": None,
-            "resolution": resolution,
-            "platform": platform,
-            "id_type": id_type,
-            "id": id_val,
-            "extension": extension,
-            "type": "movie",
-            "quality_info": quality_info,
-        }
-
-    # Fallback to old format
-    match = re.match(OLD_FILE_PATTERN, file_name)
-    if not match:
-        return None
-
-    # Determine if the file is a series based on the presence of season and episode
-    is_series = match.group(3) is not None and match.group(4) is not None
-
-    # Return extracted metadata
-    return {
-        "title": match.group(1),
-        "year": match.group(2),
-        "season": match.group(3),  # None for movies
-        "episode": match.group(4),  # None for movies
-        "episode_number": None,
-        "resolution": match.group(5),
-        "platform": match.group(6),
-        "id_type": match.group(7),  # Either "tmdbid" or "tvdbid"
-        "id": match.group(8),  # The numeric ID value
-        "extension": match.group(9),
-        "type": "series" if is_series else "movie",
-        "quality_info": f"{match.group(5)} {match.group(6)}",
-    }
+    return _DEFAULT_PARSER.parse(file_path)
+
+
+def parse_many(file_paths: Iterable[str]) -> List[Optional[FileInfo]]:
+    """
+    Bulk version of get_file_info.
+
+    :param file_paths: File paths to be analyzed.
+    :return: One result per path, in the same order (None for non-matching files).
+    """
+    return _DEFAULT_PARSER.parse_many(file_paths)
@@ -0,0 +1,51 @@
+import threading
+from typing import TYPE_CHECKING, Optional
+from src.config import HTTP_BACKOFF_FACTOR, HTTP_POOL_SIZE, HTTP_RETRIES
+
+if TYPE_CHECKING:
+    import requests
+
+_SESSION: Optional["requests.Session"] = None
+_SESSION_LOCK = threading.Lock()
+
+
+def get_session() -> "requests.Session":
+    """
+    Returns the HTTP session shared by the TMDB, TVDB and Telegram integrations.
+
+    The session keeps one keep-alive connection pool per host (up to HTTP_POOL_SIZE
+    connections each) and retries failed connections and 5xx responses with
+    exponential backoff. Non-idempotent requests (POST) are only retried when the
+    connection could not be established, so reports are never sent twice.
+    requests is only imported here, the first time a session is needed.
+
+    :return: Shared requests session
+    """
+    global _SESSION
+
+    if _SESSION is not None:
+        return _SESSION
+
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            retry = Retry(
+                total=HTTP_RETRIES,
+                backoff_factor=HTTP_BACKOFF_FACTOR,
+                status_forcelist=(500, 502, 503, 504),
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(
+                pool_connections=HTTP_POOL_SIZE,
+                pool_maxsize=HTTP_POOL_SIZE,
+                max_retries=retry,
+            )
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _SESSION = session
+
+    return _SESSION
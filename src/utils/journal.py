@@ -0,0 +1,291 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+from src.utils.cache_db import get_cache_connection
+
+_DB_FILE_NAME = "journal.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_key TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS runs_key ON runs (run_key, id);
+CREATE TABLE IF NOT EXISTS run_files (
+    run_id INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    remote_path TEXT NOT NULL,
+    state TEXT NOT NULL,
+    media_info TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (run_id, path)
+);
+"""
+
+# Steps of a file, in order; a file only moves forward
+PLANNED = "planned"
+UPLOADED = "uploaded"
+REPORTED = "reported"
+_ORDER = {PLANNED: 0, UPLOADED: 1, REPORTED: 2}
+
+
+class RunJournal:
+    """
+    Write-ahead journal of a folder run: every file is recorded as planned
+    before it is uploaded, then as uploaded and reported as each step completes,
+    and each step is committed before the run moves on. If the run dies,
+    --resume continues the interrupted run: reported files are skipped, and
+    uploaded ones are only reported, even if a "move" already removed them
+    locally (their MediaInfo details are kept in the journal).
+
+    Runs are identified by a key (mode, folder and destination); starting a new
+    run for a key forgets every run before it, finished or not, since only the
+    latest one can be resumed. In --watch mode, forget_reported() keeps the run
+    from growing for the life of the process.
+    """
+
+    def __init__(self, run_key: str, resume: bool = False):
+        """
+        :param run_key: Identifies the runs that can be resumed by each other
+        :param resume: True to continue the last interrupted run for run_key
+        """
+        self.run_key = run_key
+        self.run_id: Optional[int] = None
+        self._files: Dict[str, dict] = {}
+        self._pending_taken = False
+        self._lock = threading.Lock()
+        self._connection = get_cache_connection(_DB_FILE_NAME, _SCHEMA)
+        if self._connection is None:
+            return
+
+        try:
+            # Each step must survive a crash of the machine, not just of miaubot
+            self._connection.execute("PRAGMA synchronous=FULL")
+            if resume:
+                self._resume()
+            if self.run_id is None:
+                self._start()
+        except sqlite3.Error as e:
+            print(f"Run journal disabled: {e}")
+            self._connection = None
+
+    def _resume(self) -> None:
+        """
+        Loads the last interrupted run for the key, if any.
+        """
+        row = self._connection.execute(
+            "SELECT id, started_at, finished_at FROM runs "
+            "WHERE run_key = ? ORDER BY id DESC LIMIT 1",
+            (self.run_key,),
+        ).fetchone()
+        if not row or row[2] is not None:
+            print("No interrupted run to resume, starting a new one.")
+            return
+
+        self.run_id = row[0]
+        for path, remote_path, state, media_info in self._connection.execute(
+            "SELECT path, remote_path, state, media_info FROM run_files WHERE run_id = ?",
+            (self.run_id,),
+        ):
+            self._files[path] = {
+                "remote_path": remote_path,
+                "state": state,
+                "media_info": json.loads(media_info) if media_info else None,
+            }
+
+        counts = {state: 0 for state in _ORDER}
+        for entry in self._files.values():
+            counts[entry["state"]] += 1
+        started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(row[1]))
+        print(
+            f"Resuming run #{self.run_id} started {started}: "
+            f"{counts[REPORTED]} reported, {counts[UPLOADED]} uploaded, "
+            f"{counts[PLANNED]} pending"
+        )
+
+    def _start(self) -> None:
+        """
+        Starts a new run for the key, dropping the runs before it: interrupted
+        runs that were not resumed, or kept open by a file that kept failing,
+        could never be resumed once a newer run exists.
+        """
+        with self._lock:
+            old_runs = [
+                (run_id,)
+                for (run_id,) in self._connection.execute(
+                    "SELECT id FROM runs WHERE run_key = ?", (self.run_key,)
+                )
+            ]
+            self._connection.executemany(
+                "DELETE FROM run_files WHERE run_id = ?", old_runs
+            )
+            self._connection.executemany("DELETE FROM runs WHERE id = ?", old_runs)
+            self.run_id = self._connection.execute(
+                "INSERT INTO runs (run_key, started_at) VALUES (?, ?)",
+                (self.run_key, time.time()),
+            ).lastrowid
+            self._connection.commit()
+
+    def get(self, file_path: str) -> Optional[dict]:
+        """
+        :param file_path: Full path of the local file
+        :return: Dictionary with "remote_path", "state" and "media_info" (None if
+                 not uploaded yet) if the run already recorded the file, else None
+        """
+        return self._files.get(os.path.abspath(file_path))
+
+    def take_pending_reports(self) -> List[str]:
+        """
+        Files the run uploaded but did not report and that are gone locally
+        (moved to the remote), so a folder scan no longer finds them.
+        They are only returned by the first call, for the first batch of the run.
+
+        :return: List of file paths
+        """
+        if self._pending_taken:
+            return []
+        self._pending_taken = True
+        return [
+            path
+            for path, entry in self._files.items()
+            if entry["state"] == UPLOADED and not os.path.exists(path)
+        ]
+
+    def _record(
+        self,
+        file_path: str,
+        remote_path: str,
+        state: str,
+        media_info: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """
+        Moves a file forward to a step and commits it.
+
+        :param file_path: Full path of the local file
+        :param remote_path: Remote path of the file
+        :param state: PLANNED, UPLOADED or REPORTED
+        :param media_info: MediaInfo details of the file, kept to report it later
+        """
+        if self._connection is None:
+            return
+
+        path = os.path.abspath(file_path)
+        with self._lock:
+            entry = self._files.get(path)
+            if entry and _ORDER[entry["state"]] >= _ORDER[state]:
+                return
+            if media_info is None and entry:
+                media_info = entry["media_info"]
+            self._files[path] = {
+                "remote_path": remote_path,
+                "state": state,
+                "media_info": media_info,
+            }
+            try:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO run_files "
+                    "(run_id, path, remote_path, state, media_info, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        self.run_id,
+                        path,
+                        remote_path,
+                        state,
+                        json.dumps(media_info) if media_info else None,
+                        time.time(),
+                    ),
+                )
+                self._connection.commit()
+            except sqlite3.Error as e:
+                print(f"Error writing run journal for {file_path}: {e}")
+
+    def mark_planned(self, file_path: str, remote_path: str) -> None:
+        """
+        Records that the run is about to process a file.
+
+        :param file_path: Full path of the local file
+        :param remote_path: Remote path of the file
+        """
+        self._record(file_path, remote_path, PLANNED)
+
+    def mark_uploaded(
+        self, file_path: str, remote_path: str, media_info: Dict[str, str]
+    ) -> None:
+        """
+        Records that a file was uploaded.
+
+        :param file_path: Full path of the local file
+        :param remote_path: Remote path of the file
+        :param media_info: MediaInfo details of the file
+        """
+        self._record(file_path, remote_path, UPLOADED, media_info)
+
+    def mark_reported(self, file_path: str, remote_path: str) -> None:
+        """
+        Records that a report including the file was sent.
+
+        :param file_path: Full path of the local file
+        :param remote_path: Remote path of the file
+        """
+        self._record(file_path, remote_path, REPORTED)
+
+    def forget_reported(self) -> None:
+        """
+        Drops the files the run already reported, from memory and from the
+        journal (called after each --watch batch). A resumed run only needs the
+        files that are not reported yet.
+        """
+        if self._connection is None:
+            return
+
+        with self._lock:
+            reported = [
+                path
+                for path, entry in self._files.items()
+                if entry["state"] == REPORTED
+            ]
+            if not reported:
+                return
+            for path in reported:
+                del self._files[path]
+            try:
+                self._connection.executemany(
+                    "DELETE FROM run_files WHERE run_id = ? AND path = ?",
+                    [(self.run_id, path) for path in reported],
+                )
+                self._connection.commit()
+            except sqlite3.Error as e:
+                print(f"Error writing run journal: {e}")
+
+    def finish(self) -> None:
+        """
+        Marks the run as finished, so --resume no longer continues it. Runs with
+        files that were not reported (failed uploads or sends) stay open.
+        """
+        if self._connection is None:
+            return
+
+        with self._lock:
+            unfinished = sum(
+                1 for entry in self._files.values() if entry["state"] != REPORTED
+            )
+            if unfinished:
+                print(
+                    f"{unfinished} files of run #{self.run_id} were not completed, "
+                    "run again with --resume to retry them."
+                )
+                return
+
+            try:
+                self._connection.execute(
+                    "UPDATE runs SET finished_at = ? WHERE id = ?",
+                    (time.time(), self.run_id),
+                )
+                self._connection.commit()
+            except sqlite3.Error as e:
+                print(f"Error writing run journal: {e}")
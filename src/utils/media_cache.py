@@ -0,0 +1,140 @@
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, Optional
+from src.config import MEDIA_CACHE_MAX_ENTRIES
+from src.utils.cache_db import get_cache_connection
+
+_DB_FILE_NAME = "media_info.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS media_info (
+    device INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    data TEXT NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (device, inode)
+);
+CREATE INDEX IF NOT EXISTS media_info_last_used ON media_info (last_used);
+"""
+
+# Inserts between two evictions: counting the entries scans the whole table
+_EVICT_EVERY = 256
+# last_used only orders evictions: hits refresh it at most once a day, so a
+# fully cached re-run does not write to the database for every file
+_TOUCH_INTERVAL = 24 * 3600
+
+
+def _get_connection() -> Optional[sqlite3.Connection]:
+    """
+    Opens (or re-uses) the SQLite connection backing the MediaInfo cache.
+
+    :return: SQLite connection, or None if the cache directory is not usable
+    """
+    return get_cache_connection(_DB_FILE_NAME, _SCHEMA)
+
+
+def get_cached_media_info(file_path: str) -> Optional[Dict[str, str]]:
+    """
+    Looks up the MediaInfo result of a file by its identity (device, inode, size, mtime).
+
+    :param file_path: Full path of the file
+    :return: Cached dictionary with video, audio and subtitle details, or None on a miss
+    """
+    connection = _get_connection()
+    if connection is None:
+        return None
+
+    try:
+        stat = os.stat(file_path)
+        row = connection.execute(
+            "SELECT size, mtime_ns, data, last_used FROM media_info "
+            "WHERE device = ? AND inode = ?",
+            (stat.st_dev, stat.st_ino),
+        ).fetchone()
+        if not row or row[0] != stat.st_size or row[1] != stat.st_mtime_ns:
+            return None
+
+        now = time.time()
+        if now - row[3] >= _TOUCH_INTERVAL:
+            connection.execute(
+                "UPDATE media_info SET last_used = ? WHERE device = ? AND inode = ?",
+                (now, stat.st_dev, stat.st_ino),
+            )
+            connection.commit()
+        return json.loads(row[2])
+    except (OSError, sqlite3.Error, ValueError) as e:
+        print(f"Error reading MediaInfo cache for {file_path}: {e}")
+    return None
+
+
+def store_media_info(file_path: str, media_info: Dict[str, str]) -> None:
+    """
+    Stores the MediaInfo result of a file and, every _EVICT_EVERY inserts,
+    evicts the least recently used entries beyond MEDIA_CACHE_MAX_ENTRIES
+    (so the cache can briefly hold up to _EVICT_EVERY entries more).
+
+    :param file_path: Full path of the file
+    :param media_info: Dictionary with video, audio and subtitle details
+    """
+    connection = _get_connection()
+    if connection is None:
+        return
+
+    try:
+        stat = os.stat(file_path)
+        cursor = connection.execute(
+            "INSERT OR REPLACE INTO media_info "
+            "(device, inode, size, mtime_ns, path, data, last_used) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                stat.st_dev,
+                stat.st_ino,
+                stat.st_size,
+                stat.st_mtime_ns,
+                os.path.abspath(file_path),
+                json.dumps(media_info),
+                time.time(),
+            ),
+        )
+        # Size-bounded eviction: drop the least recently used entries. Rowids
+        # grow by one per insert across processes, so this runs every
+        # _EVICT_EVERY inserts even when each process stores a single file
+        if cursor.lastrowid % _EVICT_EVERY == 0:
+            connection.execute(
+                "DELETE FROM media_info WHERE rowid IN ("
+                "SELECT rowid FROM media_info ORDER BY last_used ASC "
+                "LIMIT max(0, (SELECT COUNT(*) FROM media_info) - ?))",
+                (MEDIA_CACHE_MAX_ENTRIES,),
+            )
+        connection.commit()
+    except (OSError, sqlite3.Error) as e:
+        print(f"Error writing MediaInfo cache for {file_path}: {e}")
+
+
+def clear_media_cache(path_prefix: Optional[str] = None) -> int:
+    """
+    Invalidates cached MediaInfo results.
+
+    :param path_prefix: Only invalidate files under this path (all entries if None)
+    :return: Number of removed entries
+    """
+    connection = _get_connection()
+    if connection is None:
+        return 0
+
+    if path_prefix:
+        prefix = os.path.abspath(path_prefix)
+        folder_prefix = prefix.rstrip(os.sep) + os.sep
+        cursor = connection.execute(
+            "DELETE FROM media_info WHERE path = ? OR substr(path, 1, ?) = ?",
+            (prefix, len(folder_prefix), folder_prefix),
+        )
+    else:
+        cursor = connection.execute("DELETE FROM media_info")
+    connection.commit()
+    return cursor.rowcount
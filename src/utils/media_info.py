@@ -1,15 +1,101 @@
-from typing import Dict, List
-from pymediainfo import MediaInfo
+import os
+from typing import TYPE_CHECKING, BinaryIO, Dict, List, Optional, Tuple
+from src.config import PROBE_BYTE_BUDGET, PROBE_PARSE_SPEED
+from src.utils.media_cache import get_cached_media_info, store_media_info
 
+if TYPE_CHECKING:
+    from pymediainfo import MediaInfo
 
-def get_media_info(file_path: str) -> Dict[str, str]:
+
+class _BudgetedReader:
+    """
+    Read-only file wrapper that stops returning data once a byte budget is spent,
+    so MediaInfo cannot pull a whole file over a network mount. Seeks are free:
+    only the bytes actually read count against the budget.
+    """
+
+    mode = "rb"
+
+    def __init__(self, raw: BinaryIO, budget: int):
+        """
+        :param raw: File opened in binary mode
+        :param budget: Maximum number of bytes to read
+        """
+        self._raw = raw
+        self._size = os.fstat(raw.fileno()).st_size
+        self.remaining = budget
+        self.exhausted = False
+
+    def read(self, size: Optional[int] = -1) -> bytes:
+        if self.remaining <= 0:
+            # MediaInfo wanted more than the budget allows; sticky, so a later
+            # read at the end of the file does not hide the truncated parse
+            self.exhausted = self.exhausted or self._raw.tell() < self._size
+            return b""
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self._raw.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        return self._raw.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._raw.tell()
+
+
+def _parse_limited(file_path: str) -> Tuple["MediaInfo", bool]:
+    """
+    Parses a file reading at most PROBE_BYTE_BUDGET bytes, at PROBE_PARSE_SPEED.
+
+    :param file_path: Full path of the file
+    :return: Tuple (MediaInfo result, True if the budget ran out before MediaInfo finished)
+    """
+    from pymediainfo import MediaInfo
+
+    # Unbuffered, so the OS read-ahead is the only thing fetched beyond the budget
+    with open(file_path, "rb", buffering=0) as raw:
+        reader = _BudgetedReader(raw, PROBE_BYTE_BUDGET)
+        media_info = MediaInfo.parse(reader, parse_speed=PROBE_PARSE_SPEED)
+    return media_info, reader.exhausted
+
+
+def get_media_info(
+    file_path: str, use_cache: bool = True, fast: bool = False
+) -> Dict[str, str]:
     """
     Gets codec, audio, and subtitles from the file using pymediainfo.
+    Results are cached on disk by file identity so unchanged files are not re-parsed.
+
+    In fast mode only the first PROBE_BYTE_BUDGET bytes (plus whatever MediaInfo
+    seeks to within that budget) are read, which is enough for the track headers of
+    MKV/MP4 files. If MediaInfo wanted more, the result is flagged as "incomplete";
+    such results are reused by later fast probes but re-parsed by full ones.
 
     :param file_path: Full path of the file
+    :param use_cache: True to consult and update the persistent MediaInfo cache
+    :param fast: True to limit how much of the file is read (for network mounts)
     :return: Dictionary with video, audio, and subtitle details
     """
-    media_info = MediaInfo.parse(file_path)
+    if use_cache:
+        cached = get_cached_media_info(file_path)
+        if cached is not None and (fast or not cached.get("incomplete")):
+            return cached
+
+    # pymediainfo loads libmediainfo: only pay for it when a file is actually parsed
+    from pymediainfo import MediaInfo
+
+    incomplete = False
+    if fast:
+        media_info, incomplete = _parse_limited(file_path)
+        if incomplete:
+            print(
+                f"MediaInfo read limit reached for {os.path.basename(file_path)}, "
+                "details may be incomplete"
+            )
+    else:
+        media_info = MediaInfo.parse(file_path)
     video_info: List[str] = []
     audio_info: List[str] = []
     subtitle_info: List[str] = []
@@ -47,8 +133,15 @@ def get_media_info(file_path: str) -> Dict[str, str]:
             # )
             subtitle_info.append(f"{subtitle_name} ({subtitle_format})")
 
-    return {
+    result = {
         "video": ", ".join(video_info),
         "audio": ", ".join(audio_info),
         "subtitles": ", ".join(subtitle_info),
     }
+    if incomplete:
+        result["incomplete"] = True
+
+    if use_cache:
+        store_media_info(file_path, result)
+
+    return result
@@ -0,0 +1,621 @@
+import os
+import queue
+import threading
+from collections import defaultdict
+from functools import partial
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Tuple
+from src.config import PIPELINE_QUEUE_SIZE, TG_BOT_TOKEN, TG_CHAT_ID
+from src.utils.artwork_prefetch import ArtworkPrefetcher, fetch_backdrop
+from src.utils.dispatch import ReportDispatcher
+from src.utils.file_info import get_file_info
+from src.utils.journal import REPORTED, UPLOADED, RunJournal
+from src.utils.media_info import get_media_info
+from src.utils.profiling import PROFILER
+from src.utils.records import Episode
+from src.utils.rclone import RemoteManifest, upload_batch, upload_files
+from src.utils.report import (
+    format_consolidated_report,
+    format_report,
+    send_report,
+)
+from src.utils.telemetry import TransferTelemetry
+from src.utils.run_state import get_file_state, mark_reported, mark_uploaded
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+    from src.utils.rclone_rc import RcloneRC
+
+# Marks the end of a stage's input
+_DONE = object()
+
+
+def get_episode_sort_key(episode_str: str) -> int:
+    """
+    Extract the first episode number from episode string for sorting.
+
+    :param episode_str: Episode string like "01" or "04-06"
+    :return: Integer value of the first episode number
+    """
+    # Extract first episode number from format like "04-06" or just "01"
+    if "-" in episode_str:
+        return int(episode_str.split("-")[0])
+    return int(episode_str)
+
+
+def single_file_operation(operation: str) -> str:
+    """
+    Maps copy/move to copyto/moveto, so the destination includes the file name.
+    Any other operation (e.g. an explicit *to variant) is kept as is.
+
+    :param operation: rclone operation requested by the user
+    :return: rclone operation to use for a single file
+    """
+    if operation == "copy":
+        return "copyto"
+    if operation == "move":
+        return "moveto"
+    return operation
+
+
+def dispatch_report(
+    report: str,
+    info: dict,
+    dry_run: bool,
+    dispatcher: Optional[ReportDispatcher] = None,
+    on_sent: Optional[Callable[[], None]] = None,
+    artwork: Optional[ArtworkPrefetcher] = None,
+) -> None:
+    """
+    Queues a report on the background dispatcher, or sends it right away if there is none.
+
+    :param report: Report to send
+    :param info: File information used to look up the backdrop
+    :param dry_run: True to simulate the send
+    :param dispatcher: Background Telegram dispatcher, if any
+    :param on_sent: Called once the report was actually sent (not in dry-run mode)
+    :param artwork: Backdrop lookups prefetched by the run, if any
+    """
+    if dry_run:
+        on_sent = None
+
+    lookup = artwork.get_backdrop_url if artwork else fetch_backdrop
+    get_backdrop = partial(lookup, info["id"], info["id_type"], info["type"])
+    if dispatcher:
+        dispatcher.submit(TG_CHAT_ID, report, get_backdrop, on_sent)
+    else:
+        backdrop_url = get_backdrop()
+        with PROFILER.stage("report"):
+            sent = send_report(TG_CHAT_ID, TG_BOT_TOKEN, report, backdrop_url, dry_run)
+        if sent and on_sent:
+            on_sent()
+
+
+def _start_stage(
+    name: str,
+    workers: int,
+    inbox: queue.Queue,
+    outbox: Optional[queue.Queue],
+    handle: Callable[[dict], Optional[dict]],
+    flush: Optional[Callable[[], List[dict]]] = None,
+    failed: Optional[List[str]] = None,
+    stop: Optional[threading.Event] = None,
+) -> List[threading.Thread]:
+    """
+    Starts the worker threads of a pipeline stage.
+
+    Each item taken from inbox is passed to handle; a returned item is put on
+    outbox, None drops it; the path of an item handle raised on is added to
+    failed. Once the input ends, flush (if any) is called by the last worker
+    and its items are forwarded before the end marker. Once stop is set, the
+    remaining items are dropped and flush is skipped.
+
+    :param name: Stage name, used in thread names and error messages
+    :param workers: Number of worker threads
+    :param inbox: Queue the stage reads from
+    :param outbox: Queue of the next stage (None for the last stage)
+    :param handle: Function processing one item
+    :param flush: Function returning the items held back until the input ends
+    :param failed: List collecting the paths of the items that raised
+    :param stop: Event set when the run is interrupted
+    :return: List of started threads
+    """
+    remaining = [workers]
+    lock = threading.Lock()
+
+    def _forward(item: dict) -> None:
+        if outbox is not None:
+            outbox.put(item)
+
+    def _worker() -> None:
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                # Let the other workers of this stage see the end marker too
+                inbox.put(_DONE)
+                break
+            if stop is not None and stop.is_set():
+                continue
+            try:
+                result = handle(item)
+            except Exception as e:
+                print(f"Error in {name} stage for {item['local_path']}: {e}")
+                if failed is not None:
+                    failed.append(item["local_path"])
+                continue
+            if result is not None:
+                _forward(result)
+
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            if flush and not (stop is not None and stop.is_set()):
+                try:
+                    for item in flush():
+                        _forward(item)
+                except Exception as e:
+                    print(f"Error in {name} stage: {e}")
+            _forward(_DONE)
+
+    threads = [
+        threading.Thread(target=_worker, name=f"{name}-{index}", daemon=True)
+        for index in range(max(1, workers))
+    ]
+    remaining[0] = len(threads)
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+class MediaPipeline:
+    """
+    Processes files through the stages scan -> parse -> probe -> upload -> report.
+
+    Stages run in their own threads and are connected by bounded queues
+    (PIPELINE_QUEUE_SIZE items), so MediaInfo probing, rclone transfers and
+    Telegram sends overlap instead of waiting on each other; a slow stage only
+    blocks the stages before it once its queue is full.
+
+    - parse: one thread; file name parsing, --incremental and --resume checks.
+      The backdrop lookup of each new movie or series starts here, on a
+      thread pool of its own (see ArtworkPrefetcher). Not configurable: name
+      parsing is pure Python and holds the GIL, so more threads would not
+      parse any faster.
+    - probe: probe_workers threads; MediaInfo runs in a process pool when > 1.
+    - upload: upload_workers rclone jobs (processes, or jobs of an rclone rcd),
+      or a single batched run per destination root ("batch" mode, which
+      waits for all files).
+    - report: one thread; movies are reported as soon as they are uploaded,
+      series are grouped per season and reported once the input ends. Not
+      configurable either: it only formats reports and hands them over, since
+      backdrops are prefetched and sends run on the dispatcher thread, paced
+      per chat by TG_CHAT_INTERVAL. One thread also keeps the season grouping
+      free of locks.
+    """
+
+    def __init__(
+        self,
+        remote_path_for: Callable[[str], str],
+        upload_operation: Optional[str] = None,
+        config_path: str = "",
+        extra_args: str = "",
+        dry_run: bool = False,
+        dispatcher: Optional[ReportDispatcher] = None,
+        probe_workers: int = 1,
+        upload_workers: int = 1,
+        upload_mode: str = "file",
+        use_cache: bool = True,
+        fast_probe: bool = False,
+        incremental: bool = False,
+        group_series: bool = True,
+        rc_client: Optional["RcloneRC"] = None,
+        telemetry: Optional[TransferTelemetry] = None,
+        journal: Optional[RunJournal] = None,
+        manifest: Optional[RemoteManifest] = None,
+        print_file_info: bool = False,
+    ):
+        """
+        :param remote_path_for: Builds the remote path of a local file
+        :param upload_operation: rclone operation (e.g. "copy", "move"); None to only report
+        :param config_path: Path to the rclone configuration file
+        :param extra_args: Additional arguments for rclone
+        :param dry_run: True to simulate uploads and sends
+        :param dispatcher: Background Telegram dispatcher (reports are sent inline if None)
+        :param probe_workers: Number of files probed at the same time
+        :param upload_workers: Number of rclone transfers running at the same time
+        :param upload_mode: "file" (one rclone call per file) or "batch"
+        :param use_cache: True to use the persistent MediaInfo cache
+        :param fast_probe: True to only read the file headers with MediaInfo
+        :param incremental: True to skip files a previous run already handled
+        :param group_series: True to send one report per season instead of per episode
+        :param rc_client: Upload through this rclone rcd instead of one rclone
+                          process per file (batch mode does not apply then)
+        :param telemetry: Transfer telemetry to record every upload in, if any
+        :param journal: Journal of the run, to record each step in and to skip
+                        the steps an interrupted run already did (--resume)
+        :param manifest: Listing of the destination; files it already has with the
+                         same size are not uploaded again (--precheck-remote)
+        :param print_file_info: True to print the parsed details of each file
+                                (single-file mode, read from FileBot logs)
+        """
+        self.remote_path_for = remote_path_for
+        self.upload_operation = upload_operation
+        self.config_path = config_path
+        self.extra_args = extra_args
+        self.dry_run = dry_run
+        self.dispatcher = dispatcher
+        self.probe_workers = probe_workers
+        self.upload_workers = upload_workers
+        self.upload_mode = upload_mode
+        self.use_cache = use_cache
+        self.fast_probe = fast_probe
+        self.incremental = incremental
+        self.group_series = group_series
+        self.rc_client = rc_client
+        self.telemetry = telemetry
+        self.journal = journal
+        self.manifest = manifest
+        self.print_file_info = print_file_info
+
+    def run(self, file_paths: Iterable[str]) -> Dict[str, List[str]]:
+        """
+        Runs files through the pipeline and waits until every stage finished.
+
+        :param file_paths: Paths of the files to process (consumed lazily)
+        :return: Dictionary with the "invalid", "failed" and "processed" file paths
+        """
+        self._results: Dict[str, List[str]] = {
+            "invalid": [],
+            "failed": [],
+            "processed": [],
+        }
+        self._episodes_by_series = defaultdict(lambda: defaultdict(list))
+        self._media_infos: Dict[tuple, Dict[str, str]] = {}
+        self._batched: List[dict] = []
+        self._artwork = ArtworkPrefetcher()
+
+        to_parse, to_probe, to_upload, to_report = (
+            queue.Queue(maxsize=PIPELINE_QUEUE_SIZE) for _ in range(4)
+        )
+        pool = None
+        if self.probe_workers > 1:
+            # multiprocessing is only loaded when probes run in processes
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            # Workers start while the stage, dispatcher and prefetch threads
+            # run: fork() could copy a lock one of them holds (stdout, sqlite)
+            # and deadlock the child, so they are never forked from this process
+            method = (
+                "forkserver"
+                if "forkserver" in multiprocessing.get_all_start_methods()
+                else "spawn"
+            )
+            pool = ProcessPoolExecutor(
+                max_workers=self.probe_workers,
+                mp_context=multiprocessing.get_context(method),
+            )
+
+        try:
+            failed = self._results["failed"]
+            stop = threading.Event()
+            threads = _start_stage(
+                "parse", 1, to_parse, to_probe, self._parse, failed=failed, stop=stop
+            )
+            threads += _start_stage(
+                "probe",
+                self.probe_workers,
+                to_probe,
+                to_upload,
+                partial(self._probe, pool),
+                failed=failed,
+                stop=stop,
+            )
+            if self.upload_operation is None:
+                threads += _start_stage(
+                    "upload",
+                    1,
+                    to_upload,
+                    to_report,
+                    lambda x: x,
+                    failed=failed,
+                    stop=stop,
+                )
+            elif self.upload_mode == "batch" and self.rc_client is None:
+                threads += _start_stage(
+                    "upload",
+                    1,
+                    to_upload,
+                    to_report,
+                    self._batched.append,
+                    flush=self._upload_batched,
+                    failed=failed,
+                    stop=stop,
+                )
+            else:
+                threads += _start_stage(
+                    "upload",
+                    self.upload_workers,
+                    to_upload,
+                    to_report,
+                    self._upload,
+                    failed=failed,
+                    stop=stop,
+                )
+            threads += _start_stage(
+                "report",
+                1,
+                to_report,
+                None,
+                self._report,
+                flush=self._report_series,
+                failed=failed,
+                stop=stop,
+            )
+
+            try:
+                # Scan stage: feeds paths as the folder listing produces them
+                for file_path in file_paths:
+                    to_parse.put({"local_path": file_path})
+                to_parse.put(_DONE)
+
+                for thread in threads:
+                    thread.join()
+            except KeyboardInterrupt:
+                # Ctrl+C: the steps already running finish, the files still
+                # queued are dropped and held reports are not sent; the
+                # journal keeps them for --resume
+                print("Interrupted, waiting for the running steps to finish...")
+                stop.set()
+                to_parse.put(_DONE)
+                for thread in threads:
+                    thread.join()
+                raise
+        finally:
+            if pool:
+                pool.shutdown()
+            self._artwork.close()
+
+        return self._results
+
+    def _parse(self, item: dict) -> Optional[dict]:
+        """
+        Parses the file name and computes the remote path of a file.
+        """
+        file_path = item["local_path"]
+        file = os.path.basename(file_path)
+        remote_path = self.remote_path_for(file_path)
+
+        already_uploaded = False
+        media_info = None
+        entry = self.journal.get(file_path) if self.journal else None
+        if entry and entry["remote_path"] == remote_path:
+            if entry["state"] == REPORTED:
+                print(f"Already reported by the resumed run, skipping: {file}")
+                return None
+            if entry["state"] == UPLOADED:
+                # Reported with the details journaled at upload time, which
+                # also covers files a "move" already took away
+                already_uploaded = True
+                media_info = entry["media_info"]
+        elif self.incremental:
+            state = get_file_state(file_path, remote_path)
+            if state and state["reported"]:
+                if state["uploaded"] or self.upload_operation is None:
+                    print(f"Unchanged since last run, skipping: {file}")
+                    return None
+            # Files uploaded by a previous run whose report did not go out
+            already_uploaded = bool(state and state["uploaded"])
+
+        with PROFILER.stage("parse", file_path):
+            info = get_file_info(file_path)
+        if not info:
+            print(f"Invalid file: {file}")
+            self._results["invalid"].append(file_path)
+            return None
+
+        print(f"Processing file: {file}")
+        if self.print_file_info:
+            print(f"File info parsed: {info.to_dict()}")
+        self._artwork.prefetch(info["id"], info["id_type"], info["type"])
+        if self.journal:
+            self.journal.mark_planned(file_path, remote_path)
+        item.update(
+            info=info,
+            remote_path=remote_path,
+            already_uploaded=already_uploaded,
+            media_info=media_info,
+        )
+        return item
+
+    def _probe(self, pool: Optional["ProcessPoolExecutor"], item: dict) -> dict:
+        """
+        Reads the MediaInfo details of a file.
+        """
+        if item["media_info"] is not None:
+            return item
+
+        with PROFILER.stage("probe", item["local_path"]):
+            if pool:
+                future = pool.submit(
+                    get_media_info, item["local_path"], self.use_cache, self.fast_probe
+                )
+                item["media_info"] = future.result()
+            else:
+                item["media_info"] = get_media_info(
+                    item["local_path"], self.use_cache, self.fast_probe
+                )
+        return item
+
+    def _uploaded(self, item: dict, success: bool) -> Optional[dict]:
+        """
+        Records the result of an upload; only uploaded files go on to be reported.
+        """
+        if not success:
+            print(f"Error uploading file: {os.path.basename(item['local_path'])}")
+            self._results["failed"].append(item["local_path"])
+            return None
+        if not self.dry_run:
+            mark_uploaded(item["local_path"], item["remote_path"])
+            if self.manifest:
+                self.manifest.add(item["local_path"], item["remote_path"])
+        if self.journal:
+            self.journal.mark_uploaded(
+                item["local_path"], item["remote_path"], item["media_info"]
+            )
+        return item
+
+    def _mark_reported(self, files: List[Tuple[str, str]]) -> None:
+        """
+        Records that a report was sent (called by dispatch_report).
+
+        :param files: (local path, remote path) of the files included in the report
+        """
+        for local_path, remote_path in files:
+            mark_reported(local_path, remote_path)
+            if self.journal:
+                self.journal.mark_reported(local_path, remote_path)
+
+    def _on_remote(self, item: dict) -> bool:
+        """
+        Checks the destination listing (--precheck-remote) for a file about to be uploaded.
+        """
+        if self.manifest is None or not self.manifest.has(
+            item["local_path"], item["remote_path"]
+        ):
+            return False
+        print(
+            f"Already on the remote, skipping upload: {os.path.basename(item['local_path'])}"
+        )
+        return True
+
+    def _upload(self, item: dict) -> Optional[dict]:
+        """
+        Uploads one file with its own rclone call, or as a job of the rclone rcd.
+        """
+        if item["already_uploaded"]:
+            return item
+        if self._on_remote(item):
+            return self._uploaded(item, True)
+
+        with PROFILER.stage("upload", item["local_path"]):
+            if self.rc_client:
+                success = self.rc_client.upload(
+                    item["local_path"],
+                    item["remote_path"],
+                    single_file_operation(self.upload_operation),
+                    self.dry_run,
+                    telemetry=self.telemetry,
+                )
+            else:
+                success = upload_files(
+                    local_path=item["local_path"],
+                    remote_path=item["remote_path"],
+                    config_path=self.config_path,
+                    extra_args=self.extra_args,
+                    dry_run=self.dry_run,
+                    operation=single_file_operation(self.upload_operation),
+                    # Interleaved progress bars from parallel jobs are unreadable
+                    progress=self.upload_workers <= 1,
+                    telemetry=self.telemetry,
+                )
+        return self._uploaded(item, success)
+
+    def _upload_batched(self) -> List[dict]:
+        """
+        Uploads the files collected in "batch" mode, one rclone run per destination root.
+        """
+        pending = []
+        for item in self._batched:
+            if item["already_uploaded"]:
+                continue
+            if self._on_remote(item):
+                self._uploaded(item, True)
+                continue
+            pending.append(item)
+
+        with PROFILER.stage("upload"):
+            results = upload_batch(
+                [
+                    (
+                        item["local_path"],
+                        item["remote_path"],
+                        single_file_operation(self.upload_operation),
+                    )
+                    for item in pending
+                ],
+                config_path=self.config_path,
+                extra_args=self.extra_args,
+                dry_run=self.dry_run,
+                telemetry=self.telemetry,
+            )
+        for item, success in zip(pending, results):
+            if not self._uploaded(item, success):
+                item["failed"] = True
+        return [item for item in self._batched if not item.get("failed")]
+
+    def _report(self, item: dict) -> None:
+        """
+        Reports a movie right away, or holds a series episode for its season report.
+        """
+        info = item["info"]
+        self._results["processed"].append(item["local_path"])
+
+        # Group episodes by series and season
+        if info["type"] == "series" and self.group_series:
+            series_key = f"{info['title']} ({info['year']})"
+            # Episodes of a season usually share their MediaInfo summary:
+            # keep a single copy of each distinct one
+            media_info = item["media_info"]
+            media_info = self._media_infos.setdefault(
+                tuple(media_info.items()), media_info
+            )
+            self._episodes_by_series[series_key][info["season"]].append(
+                Episode(
+                    info=info,
+                    media_info=media_info,
+                    local_path=item["local_path"],
+                    remote_path=item["remote_path"],
+                    episode=get_episode_sort_key(info["episode"]),
+                )
+            )
+            return None
+
+        report = format_report(info, item["media_info"], item["remote_path"])
+        dispatch_report(
+            report,
+            info,
+            self.dry_run,
+            self.dispatcher,
+            on_sent=partial(
+                self._mark_reported, [(item["local_path"], item["remote_path"])]
+            ),
+            artwork=self._artwork,
+        )
+        return None
+
+    def _report_series(self) -> List[dict]:
+        """
+        Sends the consolidated season reports once every episode went through.
+        """
+        for seasons in self._episodes_by_series.values():
+            for episodes in seasons.values():
+                # Sort episodes by episode number
+                episodes.sort(key=lambda x: x.episode)
+
+                report = format_consolidated_report(episodes, episodes[0].remote_path)
+                dispatch_report(
+                    report,
+                    episodes[0].info,
+                    self.dry_run,
+                    self.dispatcher,
+                    on_sent=partial(
+                        self._mark_reported,
+                        [
+                            (episode.local_path, episode.remote_path)
+                            for episode in episodes
+                        ],
+                    ),
+                    artwork=self._artwork,
+                )
+        return []
@@ -0,0 +1,204 @@
+import threading
+import time
+from collections import defaultdict
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional
+
+if TYPE_CHECKING:
+    import cProfile
+
+# Stages timed by --profile, in the order a file goes through them
+STAGES = ("scan", "parse", "probe", "upload", "backdrop", "report")
+
+# Number of slowest files listed in the report
+_TOP_FILES = 5
+
+_DISABLED = nullcontext()
+
+
+def _percentile(sorted_values: List[float], percent: float) -> float:
+    """
+    :param sorted_values: Values in ascending order (not empty)
+    :param percent: Percentile between 0 and 100
+    :return: Nearest-rank percentile of the values
+    """
+    index = max(0, -(-len(sorted_values) * percent // 100) - 1)
+    return sorted_values[int(index)]
+
+
+def _describe(values: List[float]) -> str:
+    """
+    :param values: Durations in seconds
+    :return: count/total/p50/p95/max columns for the report
+    """
+    values = sorted(values)
+    return (
+        f"{len(values):>7} {sum(values):>10.3f} {_percentile(values, 50):>9.4f} "
+        f"{_percentile(values, 95):>9.4f} {values[-1]:>9.4f}"
+    )
+
+
+class _StageTimer:
+    """
+    Times one pass through a stage (see StageProfiler.stage).
+    """
+
+    __slots__ = ("profiler", "name", "file_path", "start", "profiling")
+
+    def __init__(self, profiler: "StageProfiler", name: str, file_path: Optional[str]):
+        self.profiler = profiler
+        self.name = name
+        self.file_path = file_path
+        self.profiling = False
+
+    def __enter__(self) -> "_StageTimer":
+        profiler = self.profiler
+        if profiler.cprofile_stage == self.name:
+            # One profiled pass at a time: a cProfile instance can't be
+            # enabled twice, concurrent passes just aren't sampled
+            self.profiling = profiler._cprofile_lock.acquire(blocking=False)
+            if self.profiling:
+                profiler._cprofile.enable()
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        elapsed = (time.perf_counter_ns() - self.start) / 1e9
+        profiler = self.profiler
+        if self.profiling:
+            profiler._cprofile.disable()
+            profiler._cprofile_lock.release()
+        profiler.add(self.name, elapsed, self.file_path)
+
+
+class StageProfiler:
+    """
+    Collects the time spent in each stage of a run (--profile) and, for one
+    chosen stage, a cProfile of the code it runs (--profile-stage).
+
+    Disabled by default: stage() then returns a shared no-op context, so
+    instrumented code costs next to nothing on normal runs.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.cprofile_stage: Optional[str] = None
+        self.started = time.perf_counter()
+        self._samples: Dict[str, List[float]] = defaultdict(list)
+        self._files: Dict[str, Dict[str, float]] = defaultdict(
+            lambda: defaultdict(float)
+        )
+        self._lock = threading.Lock()
+        self._cprofile: Optional["cProfile.Profile"] = None
+        self._cprofile_lock = threading.Lock()
+
+    def enable(self, cprofile_stage: Optional[str] = None) -> None:
+        """
+        Starts collecting stage timings.
+
+        :param cprofile_stage: Stage to also run under cProfile, if any
+        """
+        self.enabled = True
+        self.cprofile_stage = cprofile_stage
+        if cprofile_stage:
+            import cProfile
+
+            self._cprofile = cProfile.Profile()
+        self.started = time.perf_counter()
+
+    def stage(self, name: str, file_path: Optional[str] = None):
+        """
+        Context manager timing one pass through a stage.
+
+        :param name: Stage name (see STAGES)
+        :param file_path: File the pass belongs to, for the per-file breakdown
+        :return: Context manager
+        """
+        if not self.enabled:
+            return _DISABLED
+        return _StageTimer(self, name, file_path)
+
+    def iterate(self, name: str, iterable: Iterable[str]) -> Iterator[str]:
+        """
+        Times each step of a lazy iterator (e.g. the folder scan) as a pass of a stage.
+
+        :param name: Stage name
+        :param iterable: Iterator to time
+        :return: Iterator yielding the same items
+        """
+        if not self.enabled:
+            yield from iterable
+            return
+
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def add(self, name: str, elapsed: float, file_path: Optional[str] = None) -> None:
+        """
+        Records a pass through a stage.
+
+        :param name: Stage name
+        :param elapsed: Duration of the pass in seconds
+        :param file_path: File the pass belongs to, if any
+        """
+        with self._lock:
+            self._samples[name].append(elapsed)
+            if file_path:
+                self._files[file_path][name] += elapsed
+
+    def report(self) -> str:
+        """
+        Builds the profile report: time per stage and per file, with p50/p95/max.
+        Stages run concurrently, so their totals can add up to more than the wall time.
+
+        :return: Report text
+        """
+        with self._lock:
+            samples = {name: list(values) for name, values in self._samples.items()}
+            files = {path: dict(stages) for path, stages in self._files.items()}
+
+        wall = time.perf_counter() - self.started
+        header = f"{'':<10} {'count':>7} {'total s':>10} {'p50 s':>9} {'p95 s':>9} {'max s':>9}"
+        lines = [f"Profile (wall time {wall:.3f}s):", header]
+        order = [name for name in STAGES if name in samples]
+        order += sorted(name for name in samples if name not in STAGES)
+        for name in order:
+            lines.append(f"{name:<10} {_describe(samples[name])}")
+
+        if files:
+            totals = {path: sum(stages.values()) for path, stages in files.items()}
+            lines.append(f"{'per file':<10} {_describe(list(totals.values()))}")
+            lines.append("Slowest files:")
+            for path in sorted(totals, key=totals.get, reverse=True)[:_TOP_FILES]:
+                breakdown = ", ".join(
+                    f"{name} {seconds:.3f}s" for name, seconds in files[path].items()
+                )
+                lines.append(f"  {totals[path]:.3f}s {path} ({breakdown})")
+
+        if samples:
+            hottest = max(samples, key=lambda name: sum(samples[name]))
+            lines.append(f"Hottest stage: {hottest}")
+        return "\n".join(lines)
+
+    def dump_cprofile(self, path: str) -> None:
+        """
+        Writes the cProfile stats of the profiled stage (open with pstats or snakeviz).
+
+        :param path: Output file
+        """
+        if self._cprofile is None:
+            return
+        try:
+            self._cprofile.dump_stats(path)
+        except OSError as e:
+            print(f"Error writing cProfile stats to {path}: {e}")
+
+
+# Shared by every stage of the run
+PROFILER = StageProfiler()
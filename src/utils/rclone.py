@@ -1,5 +1,10 @@
+import json
 import os
 import subprocess
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from src.utils.telemetry import TransferTelemetry
 
 
 def construct_remote_path(base_remote: str, relative_path: str) -> str:
@@ -22,6 +27,8 @@ def upload_files(
     extra_args: str,
     dry_run: bool,
     operation: str,
+    progress: bool = True,
+    telemetry: Optional[TransferTelemetry] = None,
 ) -> bool:
     """
     Uploads files to the cloud using rclone.
@@ -32,6 +39,9 @@ def upload_files(
     :param extra_args: Additional arguments for rclone
     :param dry_run: True to simulate the upload without executing it
     :param operation: The rclone operation to perform (e.g., 'copy', 'copyto', 'move', 'moveto')
+    :param progress: True to show rclone's interactive progress (-P)
+    :param telemetry: If given, rclone's JSON log and stats are parsed (instead of
+                      showing -P) and the transfer is recorded there
     :return: True if the upload was successful, False otherwise
     """
 
@@ -44,11 +54,15 @@ def upload_files(
         operation,
         local_path,
         remote_path,
-        "-P",
         "--config",
         config_path,
     ]
 
+    if telemetry is not None:
+        command.extend(_STATS_ARGS)
+    elif progress:
+        command.append("-P")
+
     if extra_args:
         command.extend(extra_args.split())
 
@@ -58,6 +72,27 @@ def upload_files(
         print("Upload simulation with the command:")
         print(" ".join(command))
         return True
+    elif telemetry is not None:
+        size = _local_size(local_path)
+        result = _run_with_stats(command)
+        success = result["returncode"] == 0
+        if success:
+            print(f"Upload completed: {local_path} -> {remote_path}")
+        else:
+            print(f"Error uploading files: Return code {result['returncode']}")
+        telemetry.record(
+            local_path,
+            remote_path,
+            operation,
+            success,
+            result["duration"],
+            size=size,
+            transferred_bytes=result["bytes"],
+            ttfb=result["ttfb"],
+            errors=result["errors"],
+            retries=result["retries"],
+        )
+        return success
     else:
         try:
             result = subprocess.run(command, check=True)
@@ -70,3 +105,390 @@ def upload_files(
         except subprocess.CalledProcessError as e:
             print(f"Error uploading files: {e}")
             return False
+
+
+# JSON log with periodic stats, parsed by _run_with_stats
+_STATS_ARGS = ["--use-json-log", "--stats", "1s", "--stats-log-level", "NOTICE"]
+
+
+def _local_size(local_path: str) -> Optional[int]:
+    """
+    :param local_path: Local file or folder
+    :return: Size of the file in bytes, or None for folders and missing paths
+    """
+    try:
+        return os.path.getsize(local_path) if os.path.isfile(local_path) else None
+    except OSError:
+        return None
+
+
+def _run_with_stats(command: List[str]) -> Dict:
+    """
+    Runs rclone with a JSON log (see _STATS_ARGS) and collects its transfer stats.
+    Log messages are echoed; the periodic stats entries are not.
+
+    :param command: rclone command line
+    :return: Dictionary with returncode, duration, bytes (as last reported by
+             rclone), ttfb (seconds until the first transferred byte), errors
+             and retries
+    """
+    result = {
+        "returncode": -1,
+        "duration": 0.0,
+        "bytes": None,
+        "ttfb": None,
+        "errors": 0,
+        "retries": 0,
+    }
+    logged_errors = 0
+    start = time.monotonic()
+
+    try:
+        process = subprocess.Popen(
+            command, stderr=subprocess.PIPE, text=True, errors="replace"
+        )
+    except OSError as e:
+        print(f"Error uploading files: {e}")
+        result["errors"] = 1
+        return result
+
+    for line in process.stderr:
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            print(line.rstrip())
+            continue
+
+        stats = entry.get("stats")
+        if stats:
+            result["bytes"] = stats.get("bytes", result["bytes"])
+            result["errors"] = max(result["errors"], stats.get("errors", 0))
+            if result["ttfb"] is None and stats.get("bytes"):
+                result["ttfb"] = time.monotonic() - start
+            continue
+
+        msg = entry.get("msg", "")
+        obj = entry.get("object")
+        print(f"{obj}: {msg}" if obj else msg)
+        if msg.startswith("Attempt ") or "low level retry" in msg:
+            # "Attempt 1/3 failed with 1 errors and: ..."
+            result["retries"] += 1
+        elif entry.get("level") == "error":
+            logged_errors += 1
+
+    result["returncode"] = process.wait()
+    result["duration"] = time.monotonic() - start
+    result["errors"] = max(result["errors"], logged_errors)
+    return result
+
+
+def _split_common_root(local_path: str, remote_path: str) -> Tuple[str, str, str]:
+    """
+    Splits a (local, remote) pair into their roots and the relative path they share.
+
+    :param local_path: Local path of the file
+    :param remote_path: Remote path of the file (e.g., 'gdrive:Anime/Show/S01/file.mkv')
+    :return: Tuple (local_root, remote_root, relative_path)
+    """
+    local_parts = local_path.split(os.sep)
+    remote_parts = remote_path.split("/")
+
+    # The longest common suffix gives the fewest distinct roots per run
+    shared = 0
+    while (
+        shared < len(local_parts) - 1
+        and shared < len(remote_parts) - 1
+        and local_parts[-1 - shared] == remote_parts[-1 - shared]
+    ):
+        shared += 1
+
+    if shared == 0:
+        # Renamed on the remote side: upload the file's folder as root
+        return os.path.dirname(local_path), "", ""
+
+    return (
+        os.sep.join(local_parts[:-shared]) or os.sep,
+        "/".join(remote_parts[:-shared]),
+        "/".join(local_parts[-shared:]),
+    )
+
+
+def upload_batch(
+    uploads: List[Tuple[str, str, str]],
+    config_path: str,
+    extra_args: str,
+    dry_run: bool,
+    telemetry: Optional[TransferTelemetry] = None,
+) -> List[bool]:
+    """
+    Uploads several files with as few rclone invocations as possible.
+    Files sharing a local and remote root are sent with a single
+    'rclone copy/move --files-from-raw' and rclone's JSON log is mapped back
+    to a per-file result.
+
+    :param uploads: List of (local_path, remote_path, operation) tuples
+    :param config_path: Path to the rclone configuration file
+    :param extra_args: Additional arguments for rclone
+    :param dry_run: True to simulate the uploads without executing them
+    :param telemetry: Transfer telemetry to record each rclone run in, if any
+    :return: Success flag of each transfer, in the same order as uploads
+    """
+    import tempfile
+
+    results = [False] * len(uploads)
+    batches: Dict[Tuple[str, str, str], List[Tuple[int, str]]] = {}
+
+    for index, (local_path, remote_path, operation) in enumerate(uploads):
+        if operation not in ["copy", "copyto", "move", "moveto"]:
+            print(f"Invalid operation: {operation}")
+            continue
+
+        local_root, remote_root, relative_path = _split_common_root(
+            local_path, remote_path
+        )
+        if not relative_path:
+            # Destination name differs from the local one, needs its own copyto
+            results[index] = upload_files(
+                local_path,
+                remote_path,
+                config_path,
+                extra_args,
+                dry_run,
+                operation,
+                telemetry=telemetry,
+            )
+            continue
+
+        batch_operation = "move" if operation in ["move", "moveto"] else "copy"
+        batches.setdefault((batch_operation, local_root, remote_root), []).append(
+            (index, relative_path)
+        )
+
+    for (operation, local_root, remote_root), files in batches.items():
+        with tempfile.NamedTemporaryFile(mode="w", delete=False) as temp_file:
+            files_from_path = temp_file.name
+            for _, relative_path in files:
+                temp_file.write(relative_path + "\n")
+
+        command = [
+            "rclone",
+            operation,
+            local_root,
+            remote_root,
+            "--files-from-raw",
+            files_from_path,
+            "--config",
+            config_path,
+            "--use-json-log",
+            "--log-level",
+            "INFO",
+        ]
+        if telemetry is not None:
+            command.extend(["--stats", "1s"])
+
+        if extra_args:
+            command.extend(extra_args.split())
+
+        print(
+            f"Uploading {len(files)} files: {local_root} -> {remote_root} "
+            f"with operation {operation}"
+        )
+
+        try:
+            if dry_run:
+                print("Upload simulation with the command:")
+                print(" ".join(command))
+                for index, _ in files:
+                    results[index] = True
+                continue
+
+            transferred = set()
+            failed = set()
+            transferred_bytes = None
+            ttfb = None
+            # Measured before the transfer: moved files are gone afterwards
+            batch_size = (
+                sum(
+                    _local_size(os.path.join(local_root, path)) or 0
+                    for _, path in files
+                )
+                if telemetry is not None
+                else None
+            )
+            start = time.monotonic()
+            try:
+                process = subprocess.Popen(
+                    command, stderr=subprocess.PIPE, text=True, errors="replace"
+                )
+            except OSError as e:
+                print(f"Error uploading files: {e}")
+                continue
+
+            for line in process.stderr:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    print(line.rstrip())
+                    continue
+
+                stats = entry.get("stats")
+                if stats:
+                    transferred_bytes = stats.get("bytes", transferred_bytes)
+                    if ttfb is None and stats.get("bytes"):
+                        ttfb = time.monotonic() - start
+                    continue
+
+                obj = entry.get("object")
+                msg = entry.get("msg", "")
+                print(f"{obj}: {msg}" if obj else msg)
+                if not obj:
+                    continue
+                if entry.get("level") == "error":
+                    failed.add(obj)
+                elif msg.startswith(("Copied", "Moved")):
+                    transferred.add(obj)
+
+            returncode = process.wait()
+            if returncode != 0:
+                print(f"Error uploading files: Return code {returncode}")
+
+            for index, relative_path in files:
+                # On a clean exit unchanged files (not logged at INFO) count as uploaded
+                results[index] = relative_path not in failed and (
+                    returncode == 0 or relative_path in transferred
+                )
+
+            if telemetry is not None:
+                telemetry.record(
+                    local_root,
+                    remote_root,
+                    operation,
+                    returncode == 0,
+                    time.monotonic() - start,
+                    size=batch_size,
+                    transferred_bytes=transferred_bytes,
+                    ttfb=ttfb,
+                    errors=len(failed),
+                    files=len(files),
+                )
+        finally:
+            os.remove(files_from_path)
+
+    return results
+
+
+def list_remote_files(
+    remote_path: str, config_path: str, extra_args: str = ""
+) -> Optional[Dict[str, int]]:
+    """
+    Lists every file under a remote folder with a single recursive 'rclone lsjson'
+    (with --fast-list, so backends like Drive answer with as few API calls as possible).
+
+    :param remote_path: Remote folder (e.g., 'gdrive:Anime/Show')
+    :param config_path: Path to the rclone configuration file
+    :param extra_args: Additional arguments for rclone
+    :return: Dictionary {path relative to remote_path: size}, empty if the folder
+             does not exist yet, or None if the listing failed
+    """
+    command = [
+        "rclone",
+        "lsjson",
+        "-R",
+        "--files-only",
+        "--no-mimetype",
+        "--no-modtime",
+        "--fast-list",
+        remote_path,
+        "--config",
+        config_path,
+    ]
+    if extra_args:
+        command.extend(extra_args.split())
+
+    try:
+        result = subprocess.run(command, capture_output=True, text=True)
+    except OSError as e:
+        print(f"Error listing {remote_path}: {e}")
+        return None
+
+    # rclone exits with 3 when the folder does not exist
+    if result.returncode == 3:
+        return {}
+    if result.returncode != 0:
+        print(f"Error listing {remote_path}: {result.stderr.strip()}")
+        return None
+
+    try:
+        entries = json.loads(result.stdout or "[]")
+    except ValueError as e:
+        print(f"Error listing {remote_path}: {e}")
+        return None
+    return {entry["Path"]: entry["Size"] for entry in entries}
+
+
+class RemoteManifest:
+    """
+    Listing of a destination folder, fetched once per run in the background
+    while the files are scanned and probed (see list_remote_files), so uploads
+    can skip the files the remote already has with the same size. Uploads of
+    the run are added to it, so --watch batches never list the folder again.
+    """
+
+    def __init__(self, remote_root: str, config_path: str, extra_args: str = ""):
+        """
+        :param remote_root: Remote folder every upload of the run goes under
+        :param config_path: Path to the rclone configuration file
+        :param extra_args: Additional arguments for rclone
+        """
+        self.remote_root = remote_root.rstrip("/")
+        self._files: Optional[Dict[str, int]] = None
+        self._thread = threading.Thread(
+            target=self._fetch, args=(config_path, extra_args), daemon=True
+        )
+        self._thread.start()
+
+    def _fetch(self, config_path: str, extra_args: str) -> None:
+        start = time.monotonic()
+        self._files = list_remote_files(self.remote_root, config_path, extra_args)
+        if self._files is not None:
+            print(
+                f"Listed {len(self._files)} files in {self.remote_root} "
+                f"({time.monotonic() - start:.1f}s)"
+            )
+
+    def has(self, local_path: str, remote_path: str) -> bool:
+        """
+        Checks if a file is already on the remote, waiting for the listing if needed.
+
+        :param local_path: Local path of the file
+        :param remote_path: Remote path the file would be uploaded to
+        :return: True if the remote has a file at remote_path with the same size
+        """
+        self._thread.join()
+        prefix = self.remote_root + "/"
+        if self._files is None or not remote_path.startswith(prefix):
+            return False
+
+        size = self._files.get(remote_path[len(prefix) :])
+        if size is None:
+            return False
+        try:
+            return size == os.path.getsize(local_path)
+        except OSError:
+            return False
+
+    def add(self, local_path: str, remote_path: str) -> None:
+        """
+        Records a file the run uploaded.
+
+        :param local_path: Local path of the file
+        :param remote_path: Remote path the file was uploaded to
+        """
+        self._thread.join()
+        prefix = self.remote_root + "/"
+        if self._files is None or not remote_path.startswith(prefix):
+            return
+        try:
+            self._files[remote_path[len(prefix) :]] = os.path.getsize(local_path)
+        except OSError:
+            pass
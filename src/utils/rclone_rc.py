@@ -0,0 +1,261 @@
+import os
+import secrets
+import shlex
+import socket
+import subprocess
+import threading
+import time
+from typing import Optional, Tuple
+import requests
+from src.config import (
+    RCLONE_RC_PASS,
+    RCLONE_RC_POLL_INTERVAL,
+    RCLONE_RC_URL,
+    RCLONE_RC_USER,
+)
+from src.utils.telemetry import TransferTelemetry
+
+# Seconds to wait for a spawned 'rclone rcd' to start answering
+_STARTUP_TIMEOUT = 15.0
+
+
+def split_fs(path: str) -> Tuple[str, str]:
+    """
+    Splits a destination path into the Fs and the path inside it, as the rc API
+    expects. Every file of a remote uses the remote's root as Fs, so rclone builds
+    it once and shares its directory cache across transfers. Only for destinations:
+    a local source like "Re:Zero (2016)/file.mkv" would be read as a remote.
+
+    :param path: Remote path (e.g., 'gdrive:Anime/Show/file.mkv') or absolute local path
+    :return: Tuple (fs, remote), e.g. ('gdrive:', 'Anime/Show/file.mkv')
+    """
+    if ":" in path and not os.path.isabs(path):
+        fs, remote = path.split(":", 1)
+        return fs + ":", remote.lstrip("/")
+    return os.path.dirname(os.path.abspath(path)), os.path.basename(path)
+
+
+class RcloneRC:
+    """
+    Uploads files through a long-lived 'rclone rcd' instead of one rclone
+    process per transfer.
+
+    If RCLONE_RC_URL is set, the running daemon at that address is used
+    (with RCLONE_RC_USER / RCLONE_RC_PASS); otherwise a private rcd bound to
+    localhost is started on the first upload and stopped by close(). Transfers
+    are submitted as async operations/copyfile or operations/movefile jobs and
+    job/status is polled until they finish.
+    """
+
+    def __init__(self, config_path: str, extra_args: str = ""):
+        """
+        :param config_path: Path to the rclone configuration file (for a spawned rcd)
+        :param extra_args: Additional rclone flags for a spawned rcd (e.g. "--transfers 8")
+        """
+        self.config_path = config_path
+        self.extra_args = extra_args
+        self.url = RCLONE_RC_URL.rstrip("/")
+        self._auth = (RCLONE_RC_USER, RCLONE_RC_PASS) if RCLONE_RC_USER else None
+        self._process: Optional[subprocess.Popen] = None
+        self._session = requests.Session()
+        self._ready = False
+        self._lock = threading.Lock()
+
+    def _call(self, method: str, params: Optional[dict] = None) -> dict:
+        """
+        Calls an rc method.
+
+        :param method: rc method (e.g. "operations/copyfile")
+        :param params: Method parameters
+        :return: Decoded JSON response
+        :raises requests.RequestException: If the call fails
+        """
+        response = self._session.post(
+            f"{self.url}/{method}", json=params or {}, auth=self._auth, timeout=30
+        )
+        if response.status_code >= 400:
+            try:
+                error = response.json().get("error", response.text)
+            except ValueError:
+                error = response.text
+            raise requests.HTTPError(
+                f"{method}: {error} (HTTP {response.status_code})", response=response
+            )
+        return response.json()
+
+    def _spawn(self) -> None:
+        """
+        Starts a private rcd on a free localhost port and waits until it answers.
+        """
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+
+        user, password = "miaubot", secrets.token_urlsafe(16)
+        command = [
+            "rclone",
+            "rcd",
+            "--rc-addr",
+            f"127.0.0.1:{port}",
+            "--config",
+            self.config_path,
+        ]
+        if self.extra_args:
+            command.extend(shlex.split(self.extra_args))
+        # Credentials go through the environment: the command line is visible
+        # to every local user (ps) and the rcd can use the whole rclone config
+        env = {**os.environ, "RCLONE_RC_USER": user, "RCLONE_RC_PASS": password}
+
+        print(f"Starting rclone rcd on 127.0.0.1:{port}")
+        self._process = subprocess.Popen(command, env=env)
+        self.url = f"http://127.0.0.1:{port}"
+        self._auth = (user, password)
+
+        deadline = time.monotonic() + _STARTUP_TIMEOUT
+        while True:
+            if self._process.poll() is not None:
+                raise RuntimeError(
+                    f"rclone rcd exited with code {self._process.returncode}"
+                )
+            try:
+                self._call("rc/noop")
+                return
+            except requests.RequestException:
+                if time.monotonic() > deadline:
+                    raise RuntimeError("rclone rcd did not start in time")
+                time.sleep(0.2)
+
+    def _ensure_ready(self) -> None:
+        if self._ready:
+            return
+        with self._lock:
+            if self._ready:
+                return
+            if self.url:
+                self._call("rc/noop")
+            else:
+                self._spawn()
+            self._ready = True
+
+    def _job_stats(self, job_id: int) -> dict:
+        """
+        :param job_id: ID of an rc job
+        :return: Transfer stats of the job's group, or {} if unavailable
+        """
+        try:
+            return self._call("core/stats", {"group": f"job/{job_id}"})
+        except requests.RequestException:
+            return {}
+
+    def upload(
+        self,
+        local_path: str,
+        remote_path: str,
+        operation: str,
+        dry_run: bool,
+        telemetry: Optional[TransferTelemetry] = None,
+    ) -> bool:
+        """
+        Uploads a single file through the rc API and waits for the job to finish.
+
+        :param local_path: Local path of the file
+        :param remote_path: Remote path of the file (e.g., 'gdrive:Anime/Show/file.mkv')
+        :param operation: 'copy'/'copyto' or 'move'/'moveto'
+        :param dry_run: True to simulate the upload without executing it
+        :param telemetry: Transfer telemetry to record the upload in, if any
+        :return: True if the upload was successful, False otherwise
+        """
+        if operation not in ["copy", "copyto", "move", "moveto"]:
+            print(f"Invalid operation: {operation}")
+            return False
+
+        method = (
+            "operations/movefile"
+            if operation in ["move", "moveto"]
+            else "operations/copyfile"
+        )
+        # The source is always local, whatever its name looks like
+        src_fs = os.path.dirname(os.path.abspath(local_path))
+        src_remote = os.path.basename(local_path)
+        dst_fs, dst_remote = split_fs(remote_path)
+        params = {
+            "srcFs": src_fs,
+            "srcRemote": src_remote,
+            "dstFs": dst_fs,
+            "dstRemote": dst_remote,
+        }
+
+        print(f"Uploading files: {local_path} -> {remote_path} with operation {method}")
+
+        if dry_run:
+            print("Upload simulation with the rc call:")
+            print(f"rclone rc {method} {params}")
+            return True
+
+        size = None
+        if telemetry is not None:
+            try:
+                size = os.path.getsize(local_path)
+            except OSError:
+                pass
+        start = time.monotonic()
+        ttfb = None
+        stats: dict = {}
+
+        try:
+            self._ensure_ready()
+            job_id = self._call(method, {**params, "_async": True})["jobid"]
+
+            while True:
+                status = self._call("job/status", {"jobid": job_id})
+                if telemetry is not None:
+                    stats = self._job_stats(job_id) or stats
+                    if ttfb is None and stats.get("bytes"):
+                        ttfb = time.monotonic() - start
+                if status.get("finished"):
+                    break
+                time.sleep(RCLONE_RC_POLL_INTERVAL)
+        except (requests.RequestException, RuntimeError, OSError, KeyError) as e:
+            print(f"Error uploading files: {e}")
+            status = {"success": False}
+        else:
+            if not status.get("success"):
+                print(f"Error uploading files: {status.get('error') or 'job failed'}")
+
+        success = bool(status.get("success"))
+        if telemetry is not None:
+            telemetry.record(
+                local_path,
+                remote_path,
+                method,
+                success,
+                status.get("duration") or time.monotonic() - start,
+                size=size,
+                transferred_bytes=stats.get("bytes"),
+                ttfb=ttfb,
+                errors=stats.get("errors", 0 if success else 1),
+                retries=stats.get("retries", 0) or 0,
+            )
+
+        if success:
+            print(f"Upload completed: {local_path} -> {remote_path}")
+        return success
+
+    def close(self) -> None:
+        """
+        Stops the rcd started by this instance, if any.
+        """
+        if self._process is None:
+            return
+
+        try:
+            self._call("core/quit")
+        except requests.RequestException:
+            pass
+        try:
+            self._process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self._process.terminate()
+            self._process.wait()
+        self._process = None
+        self._ready = False
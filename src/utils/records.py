@@ -0,0 +1,85 @@
+import sys
+from dataclasses import dataclass, fields
+from typing import Any, Dict, List, Optional
+
+
+class DictAccess:
+    """
+    Read-only dict-style access (record["title"], record.get("title")) for
+    records that used to be plain dicts, so format_report and friends keep working.
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__dataclass_fields__
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default)
+
+    def keys(self) -> List[str]:
+        return [field.name for field in fields(self)]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: getattr(self, key) for key in self.keys()}
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value is not None else None
+
+
+@dataclass(slots=True)
+class FileInfo(DictAccess):
+    """
+    Metadata parsed from a file name (see get_file_info).
+
+    String fields are interned: the episodes of a series share their title,
+    year, platform, etc., so each distinct value is stored only once.
+    """
+
+    title: str
+    year: str
+    season: Optional[str]
+    episode: Optional[str]
+    episode_number: Optional[str]
+    resolution: str
+    platform: str
+    id_type: str
+    id: str
+    extension: str
+    type: str
+    quality_info: str
+
+    def __post_init__(self):
+        intern = sys.intern
+        self.title = intern(self.title)
+        self.year = intern(self.year)
+        self.season = _intern(self.season)
+        self.episode = _intern(self.episode)
+        self.resolution = intern(self.resolution)
+        self.platform = intern(self.platform)
+        self.id_type = intern(self.id_type)
+        self.id = intern(self.id)
+        self.extension = intern(self.extension)
+        self.type = intern(self.type)
+        self.quality_info = intern(self.quality_info)
+
+
+@dataclass(slots=True)
+class Episode(DictAccess):
+    """
+    An uploaded episode held until its season report is sent
+    (see format_consolidated_report).
+    """
+
+    info: FileInfo
+    media_info: Dict[str, str]
+    local_path: str
+    remote_path: str
+    episode: int
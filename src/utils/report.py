@@ -1,8 +1,27 @@
-import requests
-from typing import Dict, Optional
-from src.config import TMDB_API_KEY, TVDB_API_KEY
-
-_CACHED_TVDB_TOKEN: Optional[str] = None
+import tempfile
+import time
+from typing import IO, TYPE_CHECKING, Dict, Optional, Tuple
+from src.config import (
+    IMAGE_MAX_BYTES,
+    IMAGE_SPOOL_MAX_BYTES,
+    TG_FLOOD_RETRIES,
+    TMDB_API_KEY,
+    TVDB_API_KEY,
+)
+from src.utils.artwork_cache import (
+    get_artwork_strategy,
+    get_cached_backdrop,
+    store_artwork_strategy,
+    store_backdrop,
+)
+from src.utils.http import get_session
+from src.utils.tvdb_token import get_tvdb_token
+
+if TYPE_CHECKING:
+    import requests
+
+# TVDB artwork types (backdrop, poster) of series and movies
+_TVDB_ARTWORK_TYPES = {"series": (3, 2), "movie": (15, 14)}
 
 
 def normalize_audio_codecs(audio_info: str) -> str:
@@ -93,7 +112,7 @@ def format_consolidated_report(episodes: list, base_remote_path: str) -> str:
     """
     Generates a consolidated report for multiple episodes of the same season.
 
-    :param episodes: List of episode dictionaries with info, media_info, remote_path, and episode number
+    :param episodes: List of episodes (Episode records or dicts) with info, media_info, remote_path, and episode number
     :param base_remote_path: Base remote path for the series
     :return: Formatted consolidated report as text.
     """
@@ -166,139 +185,217 @@ def format_consolidated_report(episodes: list, base_remote_path: str) -> str:
 def get_backdrop_url(content_id: str, id_type: str, content_type: str) -> Optional[str]:
     """
     Gets the backdrop URL from either TMDB or TVDB using the ID.
+    Results, including IDs without artwork, are cached on disk (see ARTWORK_CACHE_TTL).
 
     :param content_id: The content's ID (e.g., TMDB ID or TVDB ID).
     :param id_type: The type of ID, either "tmdbid" or "tvdbid".
     :param content_type: The type of content, either "movie" or "series".
     :return: Backdrop URL or None if not found.
     """
-    try:
-        if id_type == "tmdbid":
-            # Fetch from TMDB
-            tmdb_url = f"https://api.themoviedb.org/3/{'movie' if content_type == 'movie' else 'tv'}/{content_id}"
-            tmdb_url += f"?api_key={TMDB_API_KEY}"
-            response = requests.get(tmdb_url, timeout=10)
-        elif id_type == "tvdbid":
-            # Fetch token and determine TVDB endpoint
-            token = get_tvdb_token(TVDB_API_KEY)
-            if not token:
-                print("Failed to retrieve TVDB token.")
-                return None
+    hit, url = get_cached_backdrop(id_type, content_id, content_type)
+    if hit:
+        return url
 
-            if content_type == "movie":
-                # Use /extended endpoint for movies
-                tvdb_url = f"https://api4.thetvdb.com/v4/movies/{content_id}/extended"
-            else:
-                # Use /artworks endpoint for series
-                tvdb_url = (
-                    f"https://api4.thetvdb.com/v4/series/{content_id}/artworks?type=3"
-                )
+    # Imported here so cached lookups and dry runs don't pay for loading requests
+    import requests
 
-            headers = {"Authorization": f"Bearer {token}", "accept": "application/json"}
-            response = requests.get(tvdb_url, headers=headers, timeout=10)
-        else:
-            print(f"Unsupported ID type: {id_type}")
+    try:
+        url = _fetch_backdrop_url(content_id, id_type, content_type)
+    except requests.HTTPError as e:
+        print(f"Error fetching data for {id_type}: {e}")
+        if e.response is None or e.response.status_code != 404:
             return None
+        # Unknown IDs are cached like content without artwork
+        url = None
+    except requests.RequestException as e:
+        # Network errors are not cached so the lookup is retried next time
+        print(f"Error fetching data for {id_type}: {e}")
+        return None
+
+    store_backdrop(id_type, content_id, content_type, url)
+    return url
+
 
+def _fetch_backdrop_url(
+    content_id: str, id_type: str, content_type: str
+) -> Optional[str]:
+    """
+    Requests the backdrop URL from TMDB or TVDB.
+
+    :param content_id: The content's ID (e.g., TMDB ID or TVDB ID).
+    :param id_type: The type of ID, either "tmdbid" or "tvdbid".
+    :param content_type: The type of content, either "movie" or "series".
+    :return: Backdrop URL or None if the content has no artwork.
+    :raises requests.RequestException: If the lookup itself failed.
+    """
+    if id_type == "tmdbid":
+        # Fetch from TMDB
+        tmdb_url = f"https://api.themoviedb.org/3/{'movie' if content_type == 'movie' else 'tv'}/{content_id}"
+        tmdb_url += f"?api_key={TMDB_API_KEY}"
+        response = get_session().get(tmdb_url, timeout=10)
         response.raise_for_status()
         data = response.json()
 
-        if id_type == "tmdbid":
-            # Try backdrop first, then poster
-            backdrop_path = data.get("backdrop_path")
-            poster_path = data.get("poster_path")
-            if backdrop_path:
-                return f"https://image.tmdb.org/t/p/original{backdrop_path}"
-            if poster_path:
-                return f"https://image.tmdb.org/t/p/original{poster_path}"
-        elif id_type == "tvdbid":
-
-            def _extract_first(arts, art_type=None):
-                for art in arts:
-                    if art_type is None or art.get("type") == art_type:
-                        return art.get("image")
+        # Try backdrop first, then poster
+        backdrop_path = data.get("backdrop_path")
+        poster_path = data.get("poster_path")
+        if backdrop_path:
+            return f"https://image.tmdb.org/t/p/original{backdrop_path}"
+        if poster_path:
+            return f"https://image.tmdb.org/t/p/original{poster_path}"
+        return None
+
+    if id_type != "tvdbid":
+        print(f"Unsupported ID type: {id_type}")
+        return None
+
+    if content_type == "movie":
+        # Movie artworks are part of the /extended record
+        data = _get_tvdb_data(
+            f"https://api4.thetvdb.com/v4/movies/{content_id}/extended"
+        )
+        return _select_tvdb_artwork(data, content_type)[0]
+    return _fetch_tvdb_series_artwork(content_id)
+
+
+def _get_tvdb_data(url: str) -> dict:
+    """
+    Requests a TVDB API URL with the bearer token. A token the API refuses
+    (HTTP 401, e.g. expired early) is replaced by a new login, once.
+
+    :param url: TVDB API URL
+    :return: The "data" record of the response
+    :raises requests.RequestException: If the request failed
+    """
+    import requests
+
+    token = get_tvdb_token(TVDB_API_KEY)
+    for attempt in range(2):
+        if not token:
+            raise requests.RequestException("Failed to retrieve TVDB token.")
+        headers = {"Authorization": f"Bearer {token}", "accept": "application/json"}
+        response = get_session().get(url, headers=headers, timeout=10)
+        if response.status_code != 401 or attempt:
+            break
+        print("TVDB token rejected, logging in again.")
+        token = get_tvdb_token(TVDB_API_KEY, rejected=token)
+    response.raise_for_status()
+    return response.json().get("data") or {}
+
+
+def _select_tvdb_artwork(
+    data: dict, content_type: str
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Picks the backdrop of a TVDB record, else its poster, else any artwork.
+
+    :param data: TVDB series or movie record including its "artworks"
+    :param content_type: The type of content, either "movie" or "series".
+    :return: Tuple (url, strategy), strategy being "backdrop", "poster" or
+             "any" after the kind found; (None, None) without artwork.
+    """
+    backdrop_type, poster_type = _TVDB_ARTWORK_TYPES[content_type]
+    artworks = [art for art in data.get("artworks") or [] if art.get("image")]
+    for strategy, art_type in (("backdrop", backdrop_type), ("poster", poster_type)):
+        for art in artworks:
+            if art.get("type") == art_type:
+                return art["image"], strategy
+    if artworks:
+        return artworks[0]["image"], "any"
+    if data.get("image"):
+        return data["image"], "any"
+    return None, None
+
+
+def _fetch_tvdb_series_artwork(content_id: str) -> Optional[str]:
+    """
+    Resolves the artwork of a TVDB series with a single request: all its
+    artworks at once, or only the kind found last time (a much smaller
+    response) when the series was looked up before. The kind found is
+    remembered for the next lookup.
+
+    :param content_id: TVDB series ID
+    :return: Artwork URL or None if the series has no artwork
+    :raises requests.RequestException: If the lookup itself failed
+    """
+    base_url = f"https://api4.thetvdb.com/v4/series/{content_id}/artworks"
+    strategy = get_artwork_strategy("tvdbid", content_id, "series")
+    backdrop_type, poster_type = _TVDB_ARTWORK_TYPES["series"]
+    art_type = {"backdrop": backdrop_type, "poster": poster_type}.get(strategy)
+    url = found = None
+    if art_type is not None:
+        data = _get_tvdb_data(f"{base_url}?type={art_type}")
+        url, found = _select_tvdb_artwork(data, "series")
+    if art_type is None or found != strategy:
+        # Unknown series, or its artwork changed since the last lookup
+        url, found = _select_tvdb_artwork(_get_tvdb_data(base_url), "series")
+
+    found = found or "any"
+    if found != strategy:
+        store_artwork_strategy("tvdbid", content_id, "series", found)
+    return url
+
+
+def _download_image(url: str) -> Optional[IO[bytes]]:
+    """
+    Downloads an image into a spooled buffer that stays in memory up to
+    IMAGE_SPOOL_MAX_BYTES and only spills to a temporary file above that size.
+
+    :param url: Image URL.
+    :return: Buffer positioned at the start, or None if larger than IMAGE_MAX_BYTES.
+    """
+    img_resp = get_session().get(url, timeout=15, stream=True)
+    with img_resp:
+        img_resp.raise_for_status()
+
+        content_length = int(img_resp.headers.get("Content-Length") or 0)
+        if content_length > IMAGE_MAX_BYTES:
+            print(f"Backdrop too large to upload ({content_length} bytes).")
+            return None
+
+        buffer = tempfile.SpooledTemporaryFile(max_size=IMAGE_SPOOL_MAX_BYTES)
+        size = 0
+        for chunk in img_resp.iter_content(chunk_size=64 * 1024):
+            size += len(chunk)
+            if size > IMAGE_MAX_BYTES:
+                buffer.close()
+                print(f"Backdrop too large to upload (over {IMAGE_MAX_BYTES} bytes).")
                 return None
+            buffer.write(chunk)
 
-            if content_type == "movie":
-                artworks = data.get("data", {}).get("artworks", [])
-                # 15 = hero/backdrop, 14 = poster (movie)
-                url = _extract_first(artworks, 15)
-                if not url:
-                    url = _extract_first(artworks, 14)
-                if url:
-                    return url
-            else:
-                artworks = data.get("data", []).get("artworks", [])
-                # Attempt to get backdrop (type 3) else poster (type 2)
-                url = _extract_first(artworks, 3)
-                if not url:
-                    # Fallback: make another request for posters (type 2) if initial request was for type 3
-                    try:
-                        # Request posters
-                        poster_resp = requests.get(
-                            f"https://api4.thetvdb.com/v4/series/{content_id}/artworks?type=2",
-                            headers=headers,
-                            timeout=10,
-                        )
-                        poster_resp.raise_for_status()
-                        poster_arts = (
-                            poster_resp.json().get("data", []).get("artworks", [])
-                        )
-                        url = _extract_first(poster_arts)
-                    except requests.RequestException:
-                        url = None
-                if url:
-                    return url
-
-                # Final fallback: request extended info and try to extract any hero or poster image
-                try:
-                    ext_resp = requests.get(
-                        f"https://api4.thetvdb.com/v4/series/{content_id}/extended",
-                        headers=headers,
-                        timeout=10,
-                    )
-                    ext_resp.raise_for_status()
-                    ext_data = ext_resp.json()
-                    artworks_ext = ext_data.get("data", {}).get("artworks", [])
-                    url = (
-                        _extract_first(artworks_ext, 3)
-                        or _extract_first(artworks_ext, 2)
-                        or _extract_first(artworks_ext)
-                    )
-                except requests.RequestException:
-                    url = None
-                if url:
-                    return url
-    except requests.RequestException as e:
-        print(f"Error fetching data for {id_type}: {e}")
-    return None
+    buffer.seek(0)
+    return buffer
 
 
-def get_tvdb_token(api_key: str) -> Optional[str]:
+def _post_telegram(
+    url: str, data: Dict, files: Optional[Dict] = None
+) -> "requests.Response":
     """
-    Fetches the Bearer token from TheTVDB API using the provided API key.
+    Posts a request to the Telegram Bot API, waiting and retrying when Telegram
+    answers with a flood-wait (HTTP 429 with parameters.retry_after).
 
-    :param api_key: API key for TheTVDB.
-    :return: Bearer token or None if the request fails.
+    :param url: Bot API method URL.
+    :param data: Form fields of the request.
+    :param files: Multipart files of the request (rewound before each retry).
+    :return: The last response received.
     """
-    # Re-use cached token during the lifetime of the process (TVDB tokens are valid ~1 month)
-    global _CACHED_TVDB_TOKEN
+    for attempt in range(TG_FLOOD_RETRIES + 1):
+        if files:
+            for _, file_obj in files.values():
+                file_obj.seek(0)
 
-    if _CACHED_TVDB_TOKEN:
-        return _CACHED_TVDB_TOKEN
+        response = get_session().post(url, data=data, files=files)
+        if response.status_code != 429 or attempt == TG_FLOOD_RETRIES:
+            return response
 
-    try:
-        url = "https://api4.thetvdb.com/v4/login"
-        payload = {"apikey": api_key}
-        headers = {"accept": "application/json", "Content-Type": "application/json"}
-        response = requests.post(url, json=payload, headers=headers, timeout=10)
-        response.raise_for_status()
+        try:
+            retry_after = response.json().get("parameters", {}).get("retry_after", 1)
+        except ValueError:
+            retry_after = 1
+        print(f"Telegram rate limit reached, retrying in {retry_after}s…")
+        time.sleep(retry_after)
 
-        _CACHED_TVDB_TOKEN = response.json().get("data", {}).get("token")
-        return _CACHED_TVDB_TOKEN
-    except requests.RequestException as e:
-        print(f"Error obtaining TVDB token: {e}")
-    return None
+    return response
 
 
 def send_report(
@@ -307,15 +404,17 @@ def send_report(
     report: str,
     backdrop_url: Optional[str],
     dry_run: bool = False,
-) -> None:
+) -> bool:
     """
     Sends the report to Telegram as a photo with caption or displays it in the console in dry-run mode.
+    Flood-wait responses (HTTP 429) are retried after the delay requested by Telegram.
 
     :param chat_id: Telegram chat ID.
     :param token: Telegram bot token.
     :param report: Report to send.
     :param backdrop_url: Backdrop URL.
     :param dry_run: True to simulate the send.
+    :return: True if the report was sent (or simulated), False otherwise.
     """
     if dry_run:
         print("Send simulation:")
@@ -346,48 +445,34 @@ def send_report(
         print(f"POST {url}")
         print("Payload:")
         print(json.dumps(payload, ensure_ascii=False, indent=2))
+        return True
     else:
+        import requests
+
         try:
             print("Sending report to Telegram...")
             # If the caption is too long for sendPhoto (1024-char limit) we fall back to sendMessage
             use_photo = backdrop_url is not None and len(report) <= 1024
 
             if use_photo:
-                url = f"https://api.telegram.org/bot{token}/sendPhoto"
-
-                # Download image locally to send as multipart/form-data
-                import tempfile
-                import os
-
-                try:
-                    img_resp = requests.get(backdrop_url, timeout=15, stream=True)
-                    img_resp.raise_for_status()
-
-                    with tempfile.NamedTemporaryFile(
-                        delete=False, suffix=".jpg"
-                    ) as tmp_img:
-                        for chunk in img_resp.iter_content(chunk_size=8192):
-                            tmp_img.write(chunk)
-                        temp_image_path = tmp_img.name
+                image = _download_image(backdrop_url)
+                use_photo = image is not None
 
-                    payload = {
-                        "chat_id": chat_id,
-                        "caption": report,
-                        "parse_mode": "HTML",
-                    }
+            if use_photo:
+                url = f"https://api.telegram.org/bot{token}/sendPhoto"
+                payload = {
+                    "chat_id": chat_id,
+                    "caption": report,
+                    "parse_mode": "HTML",
+                }
 
-                    with open(temp_image_path, "rb") as img_file:
-                        response = requests.post(
-                            url, data=payload, files={"photo": img_file}
-                        )
-                finally:
-                    # Ensure the temporary image is removed
-                    try:
-                        os.remove(temp_image_path)
-                    except Exception:
-                        pass
+                # Relay the downloaded image as multipart/form-data
+                with image:
+                    response = _post_telegram(
+                        url, data=payload, files={"photo": ("backdrop.jpg", image)}
+                    )
             else:
-                # Either there is no backdrop or the caption is too long
+                # No backdrop, the caption is too long or the image is too large
                 url = f"https://api.telegram.org/bot{token}/sendMessage"
                 payload = {
                     "chat_id": chat_id,
@@ -397,7 +482,7 @@ def send_report(
 
             # When use_photo branch already executed a request, ensure we don't reassign
             if not use_photo:
-                response = requests.post(url, data=payload)
+                response = _post_telegram(url, data=payload)
 
             # If sendPhoto fails (e.g. invalid URL), fall back to sendMessage
             if response.status_code != 200:
@@ -412,7 +497,7 @@ def send_report(
                         "text": report,
                         "parse_mode": "HTML",
                     }
-                    response_fb = requests.post(url_fallback, data=payload_fallback)
+                    response_fb = _post_telegram(url_fallback, data=payload_fallback)
 
                     if response_fb.status_code != 200:
                         print("Fallback sendMessage also failed:")
@@ -422,5 +507,7 @@ def send_report(
                     response.raise_for_status()
 
             print("Report sent successfully.")
+            return True
         except requests.RequestException as e:
             print(f"Error sending report to Telegram: {e}")
+            return False
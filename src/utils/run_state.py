@@ -0,0 +1,123 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+from src.utils.cache_db import get_cache_connection
+
+_DB_FILE_NAME = "state.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    remote_path TEXT NOT NULL,
+    uploaded INTEGER NOT NULL DEFAULT 0,
+    reported INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+);
+"""
+
+# Reports are marked from the dispatcher thread while the main thread reads
+_LOCK = threading.Lock()
+
+
+def _get_connection() -> Optional[sqlite3.Connection]:
+    return get_cache_connection(_DB_FILE_NAME, _SCHEMA)
+
+
+def get_file_state(file_path: str, remote_path: str) -> Optional[dict]:
+    """
+    Returns what a previous run did with a file, if the file is unchanged since then.
+
+    :param file_path: Full path of the local file
+    :param remote_path: Remote path the file is (or would be) uploaded to
+    :return: Dictionary with "uploaded" and "reported" flags, or None if the file
+             is new, changed (size, mtime or inode) or had another remote path
+    """
+    connection = _get_connection()
+    if connection is None:
+        return None
+
+    try:
+        stat = os.stat(file_path)
+        with _LOCK:
+            row = connection.execute(
+                "SELECT size, mtime_ns, inode, remote_path, uploaded, reported "
+                "FROM files WHERE path = ?",
+                (os.path.abspath(file_path),),
+            ).fetchone()
+    except (OSError, sqlite3.Error) as e:
+        print(f"Error reading run state for {file_path}: {e}")
+        return None
+
+    if not row or row[:4] != (
+        stat.st_size,
+        stat.st_mtime_ns,
+        stat.st_ino,
+        remote_path,
+    ):
+        return None
+    return {"uploaded": bool(row[4]), "reported": bool(row[5])}
+
+
+def _mark(file_path: str, remote_path: str, column: str) -> None:
+    """
+    Records a completed step for a file, resetting the other steps if the file changed.
+
+    :param file_path: Full path of the local file
+    :param remote_path: Remote path of the file
+    :param column: Step to mark, either "uploaded" or "reported"
+    """
+    connection = _get_connection()
+    if connection is None:
+        return
+
+    try:
+        stat = os.stat(file_path)
+        path = os.path.abspath(file_path)
+        identity = (stat.st_size, stat.st_mtime_ns, stat.st_ino, remote_path)
+        with _LOCK:
+            row = connection.execute(
+                "SELECT size, mtime_ns, inode, remote_path FROM files WHERE path = ?",
+                (path,),
+            ).fetchone()
+            if row != identity:
+                connection.execute(
+                    "INSERT OR REPLACE INTO files "
+                    "(path, size, mtime_ns, inode, remote_path, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (path, *identity, time.time()),
+                )
+            connection.execute(
+                f"UPDATE files SET {column} = 1, updated_at = ? WHERE path = ?",
+                (time.time(), path),
+            )
+            connection.commit()
+    except FileNotFoundError:
+        # Moved to the remote ("move"/"moveto"): nothing left to skip next run
+        return
+    except (OSError, sqlite3.Error) as e:
+        print(f"Error writing run state for {file_path}: {e}")
+
+
+def mark_uploaded(file_path: str, remote_path: str) -> None:
+    """
+    Records that a file was uploaded to remote_path.
+
+    :param file_path: Full path of the local file
+    :param remote_path: Remote path of the file
+    """
+    _mark(file_path, remote_path, "uploaded")
+
+
+def mark_reported(file_path: str, remote_path: str) -> None:
+    """
+    Records that a report including the file was sent.
+
+    :param file_path: Full path of the local file
+    :param remote_path: Remote path of the file
+    """
+    _mark(file_path, remote_path, "reported")
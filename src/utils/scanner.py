@@ -0,0 +1,163 @@
+import os
+from fnmatch import fnmatch
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_VIDEO_EXTENSIONS = (".mkv", ".mp4", ".avi")
+
+
+def parse_extensions(value: str) -> tuple:
+    """
+    Parses a comma-separated extension list such as "mkv,mp4,.avi".
+
+    :param value: Comma-separated extensions, with or without leading dots
+    :return: Tuple of extensions with leading dots
+    """
+    return tuple(
+        "." + ext.strip().lstrip(".") for ext in value.split(",") if ext.strip()
+    )
+
+
+def is_excluded(name: str, relative_path: str, patterns: Sequence[str]) -> bool:
+    """
+    Checks a name against exclude globs, both by name and by path relative to the root.
+
+    :param name: Entry name
+    :param relative_path: Entry path relative to the scanned root, using '/'
+    :param patterns: Glob patterns
+    :return: True if any pattern matches
+    """
+    return any(
+        fnmatch(name, pattern) or fnmatch(relative_path, pattern)
+        for pattern in patterns
+    )
+
+
+def _split_patterns(exclude: Sequence[str]) -> Tuple[List[str], List[str]]:
+    """
+    :param exclude: Exclude patterns, folder patterns ending with '/'
+    :return: Tuple (folder patterns without the '/', file patterns)
+    """
+    dir_patterns = [p.rstrip("/") for p in exclude if p.endswith("/")]
+    file_patterns = [p for p in exclude if not p.endswith("/")]
+    return dir_patterns, file_patterns
+
+
+def _in_excluded_folder(relative_folder: str, dir_patterns: Sequence[str]) -> bool:
+    """
+    :param relative_folder: Folder path relative to the root, using '/' ("" for the root)
+    :param dir_patterns: Folder patterns
+    :return: True if the folder or one of its parents is excluded
+    """
+    parts = [part for part in relative_folder.split("/") if part]
+    return any(
+        is_excluded(part, "/".join(parts[: index + 1]), dir_patterns)
+        for index, part in enumerate(parts)
+    )
+
+
+def is_video_file(
+    directory: str,
+    path: str,
+    extensions: Iterable[str] = DEFAULT_VIDEO_EXTENSIONS,
+    exclude: Sequence[str] = (),
+) -> bool:
+    """
+    Checks a single file of the tree with the same rules as scan_video_files
+    (e.g. for files reported by inotify).
+
+    :param directory: Root folder the exclude patterns are relative to
+    :param path: Full path of the file
+    :param extensions: File extensions to accept
+    :param exclude: Glob patterns of files or folders to skip
+    :return: True if scan_video_files would yield the file
+    """
+    name = os.path.basename(path)
+    if not name.endswith(tuple(extensions)):
+        return False
+
+    dir_patterns, file_patterns = _split_patterns(exclude)
+    relative = os.path.relpath(path, directory).replace(os.sep, "/")
+    if is_excluded(name, relative, file_patterns):
+        return False
+    return not _in_excluded_folder(relative.rpartition("/")[0], dir_patterns)
+
+
+def walk_video_folders(
+    directory: str,
+    extensions: Iterable[str] = DEFAULT_VIDEO_EXTENSIONS,
+    exclude: Sequence[str] = (),
+    top: Optional[str] = None,
+) -> Iterator[Tuple[str, List[str]]]:
+    """
+    Lazily walks a folder tree, yielding each folder that is not excluded with
+    its video files (see scan_video_files for the order and the patterns).
+
+    :param directory: Root folder the exclude patterns are relative to
+    :param extensions: File extensions to yield (e.g. (".mkv", ".mp4"))
+    :param exclude: Glob patterns of files or folders to skip
+    :param top: Subfolder of directory to walk instead of the whole tree
+    :return: Iterator of (folder path, video file paths)
+    """
+    extensions = tuple(extensions)
+    dir_patterns, file_patterns = _split_patterns(exclude)
+    relative = ""
+    if top is not None:
+        relative = os.path.relpath(top, directory).replace(os.sep, "/")
+        relative = "" if relative == "." else relative + "/"
+        if _in_excluded_folder(relative, dir_patterns):
+            return
+    pending = [(top or directory, relative)]
+
+    while pending:
+        current, relative = pending.pop()
+        subdirs = []
+        files = []
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    entry_relative = f"{relative}{entry.name}"
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        continue
+
+                    if is_dir:
+                        if not is_excluded(entry.name, entry_relative, dir_patterns):
+                            subdirs.append((entry.path, entry_relative + "/"))
+                    elif entry.name.endswith(extensions) and not is_excluded(
+                        entry.name, entry_relative, file_patterns
+                    ):
+                        files.append(entry.path)
+        except OSError as e:
+            # Unreadable folders are skipped, like os.walk does
+            print(f"Error scanning {current}: {e}")
+            continue
+
+        yield current, files
+        # Depth-first, in listing order
+        pending.extend(reversed(subdirs))
+
+
+def scan_video_files(
+    directory: str,
+    extensions: Iterable[str] = DEFAULT_VIDEO_EXTENSIONS,
+    exclude: Sequence[str] = (),
+) -> Iterator[str]:
+    """
+    Lazily yields the video files of a folder and its subfolders.
+
+    Uses os.scandir, so the entry type comes from the directory listing (d_type)
+    instead of an extra stat() per entry. Files are yielded in the same order as
+    os.walk (top-down, files of a folder before its subfolders).
+
+    Exclude patterns ending with '/' only match folders, which are pruned
+    without being listed (e.g. "Extras/"); other patterns match file names or
+    relative paths (e.g. "*sample*").
+
+    :param directory: Path of the folder to scan
+    :param extensions: File extensions to yield (e.g. (".mkv", ".mp4"))
+    :param exclude: Glob patterns of files or folders to skip
+    :return: Iterator of file paths
+    """
+    for _, files in walk_video_folders(directory, extensions, exclude):
+        yield from files
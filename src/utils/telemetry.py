@@ -0,0 +1,166 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+class TransferTelemetry:
+    """
+    Collects one record per rclone transfer and writes them as a run summary:
+    'transfers.jsonl' (one JSON object per transfer, then a summary line) and
+    'miaubot.prom', a Prometheus textfile for node_exporter's textfile collector.
+
+    Records are added from the upload threads, so access is locked.
+    """
+
+    def __init__(self):
+        self.records: List[Dict] = []
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        local_path: str,
+        remote_path: str,
+        operation: str,
+        success: bool,
+        duration: float,
+        size: Optional[int] = None,
+        transferred_bytes: Optional[int] = None,
+        ttfb: Optional[float] = None,
+        errors: int = 0,
+        retries: int = 0,
+        files: int = 1,
+    ) -> None:
+        """
+        Adds a transfer to the summary.
+
+        :param local_path: Local path of the file (or root of a batch)
+        :param remote_path: Remote path of the file (or root of a batch)
+        :param operation: rclone operation or rc method used
+        :param success: True if the transfer succeeded
+        :param duration: Wall time of the transfer in seconds
+        :param size: Size of the local file(s) in bytes, if known
+        :param transferred_bytes: Bytes rclone reported as transferred, if known
+        :param ttfb: Seconds until rclone reported the first transferred byte
+        :param errors: Number of errors rclone logged
+        :param retries: Number of low-level retries / attempts rclone logged
+        :param files: Number of files in the transfer (> 1 for batches)
+        """
+        moved = transferred_bytes if transferred_bytes is not None else size
+        with self._lock:
+            self.records.append(
+                {
+                    "time": round(time.time(), 3),
+                    "local_path": local_path,
+                    "remote_path": remote_path,
+                    "operation": operation,
+                    "files": files,
+                    "success": success,
+                    "size": size,
+                    "bytes": transferred_bytes,
+                    "duration": round(duration, 3),
+                    "ttfb": round(ttfb, 3) if ttfb is not None else None,
+                    "throughput": (
+                        round(moved / duration) if moved and duration > 0 else None
+                    ),
+                    "errors": errors,
+                    "retries": retries,
+                }
+            )
+
+    def summary(self) -> Dict:
+        """
+        Aggregates the recorded transfers.
+
+        :return: Dictionary with counts, totals and averages of the run
+        """
+        with self._lock:
+            records = list(self.records)
+
+        ok = [r for r in records if r["success"]]
+        total_bytes = sum((r["bytes"] or r["size"] or 0) for r in ok)
+        total_duration = sum(r["duration"] for r in ok)
+        ttfbs = [r["ttfb"] for r in records if r["ttfb"] is not None]
+        return {
+            "type": "summary",
+            "started_at": round(self.started_at, 3),
+            "transfers": len(records),
+            "files": sum(r["files"] for r in records),
+            "succeeded": len(ok),
+            "failed": len(records) - len(ok),
+            "bytes": total_bytes,
+            "duration": round(total_duration, 3),
+            "throughput": (
+                round(total_bytes / total_duration) if total_duration > 0 else None
+            ),
+            "ttfb_avg": round(sum(ttfbs) / len(ttfbs), 3) if ttfbs else None,
+            "errors": sum(r["errors"] for r in records),
+            "retries": sum(r["retries"] for r in records),
+        }
+
+    def write(self, directory: str) -> None:
+        """
+        Writes transfers.jsonl and miaubot.prom into a folder, replacing earlier ones.
+        Files are written to a temporary name first, so readers never see half a file.
+
+        :param directory: Folder to write to (created if needed)
+        """
+        summary = self.summary()
+        with self._lock:
+            records = list(self.records)
+
+        lines = [json.dumps(record, ensure_ascii=False) for record in records]
+        lines.append(json.dumps(summary))
+
+        metrics = [
+            (
+                "miaubot_transfers_total",
+                "counter",
+                'result="success"',
+                summary["succeeded"],
+            ),
+            ("miaubot_transfers_total", None, 'result="failed"', summary["failed"]),
+            ("miaubot_transfer_files_total", "counter", None, summary["files"]),
+            ("miaubot_transfer_bytes_total", "counter", None, summary["bytes"]),
+            (
+                "miaubot_transfer_duration_seconds_total",
+                "counter",
+                None,
+                summary["duration"],
+            ),
+            (
+                "miaubot_transfer_throughput_bytes_per_second",
+                "gauge",
+                None,
+                summary["throughput"] or 0,
+            ),
+            (
+                "miaubot_transfer_ttfb_seconds_avg",
+                "gauge",
+                None,
+                summary["ttfb_avg"] or 0,
+            ),
+            ("miaubot_transfer_errors_total", "counter", None, summary["errors"]),
+            ("miaubot_transfer_retries_total", "counter", None, summary["retries"]),
+            ("miaubot_last_run_timestamp_seconds", "gauge", None, int(time.time())),
+        ]
+        prom = []
+        for name, metric_type, labels, value in metrics:
+            if metric_type:
+                prom.append(f"# TYPE {name} {metric_type}")
+            prom.append(f"{name}{{{labels}}} {value}" if labels else f"{name} {value}")
+
+        try:
+            os.makedirs(directory, exist_ok=True)
+            for file_name, content in (
+                ("transfers.jsonl", lines),
+                ("miaubot.prom", prom),
+            ):
+                path = os.path.join(directory, file_name)
+                with open(path + ".tmp", "w", encoding="utf-8") as file:
+                    file.write("\n".join(content) + "\n")
+                os.replace(path + ".tmp", path)
+        except OSError as e:
+            print(f"Error writing transfer telemetry to {directory}: {e}")
@@ -0,0 +1,150 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+from src.config import CACHE_DIR, TVDB_TOKEN_TTL
+from src.utils.http import get_session
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of the same process are serialized
+    fcntl = None
+
+_TOKEN_FILE_NAME = "tvdb_token.json"
+_LOCK_FILE_NAME = "tvdb_token.lock"
+
+# Token of this process: (token, issued_at)
+_TOKEN: Optional[tuple] = None
+# Prefetch threads may need a token at the same time: only one logs in
+_LOCK = threading.Lock()
+
+
+def _key_id(api_key: str) -> str:
+    """
+    :param api_key: API key for TheTVDB
+    :return: Fingerprint of the key, so a token is never used with another key
+    """
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+
+@contextmanager
+def _file_lock() -> Iterator[None]:
+    """
+    Holds an exclusive lock shared by every miaubot process using the cache
+    directory (FileBot may start several at once). No-op where flock is missing.
+    """
+    if fcntl is None:
+        yield
+        return
+
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        lock_file = open(os.path.join(CACHE_DIR, _LOCK_FILE_NAME), "a")
+    except OSError:
+        yield
+        return
+
+    with lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _is_fresh(issued_at: float) -> bool:
+    return time.time() - issued_at < TVDB_TOKEN_TTL
+
+
+def _read_token(api_key: str) -> Optional[tuple]:
+    """
+    :param api_key: API key for TheTVDB
+    :return: (token, issued_at) stored by a previous login with the key, if any
+    """
+    try:
+        with open(os.path.join(CACHE_DIR, _TOKEN_FILE_NAME), encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("key") != _key_id(api_key) or not data.get("token"):
+            return None
+        return data["token"], float(data["issued_at"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _write_token(api_key: str, token: str, issued_at: float) -> None:
+    """
+    Stores a token for the next processes, readable by the current user only.
+
+    :param api_key: API key the token was issued for
+    :param token: Bearer token
+    :param issued_at: Time of the login
+    """
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # mkstemp creates the file with mode 0600
+        fd, temp_path = tempfile.mkstemp(dir=CACHE_DIR, prefix=".tvdb_token.")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(
+                {"key": _key_id(api_key), "token": token, "issued_at": issued_at}, f
+            )
+        os.replace(temp_path, os.path.join(CACHE_DIR, _TOKEN_FILE_NAME))
+    except OSError as e:
+        print(f"Error saving TVDB token: {e}")
+
+
+def _login(api_key: str) -> Optional[str]:
+    """
+    :param api_key: API key for TheTVDB
+    :return: New bearer token or None if the login fails
+    """
+    import requests
+
+    try:
+        url = "https://api4.thetvdb.com/v4/login"
+        payload = {"apikey": api_key}
+        headers = {"accept": "application/json", "Content-Type": "application/json"}
+        response = get_session().post(url, json=payload, headers=headers, timeout=10)
+        response.raise_for_status()
+        return response.json().get("data", {}).get("token")
+    except requests.RequestException as e:
+        print(f"Error obtaining TVDB token: {e}")
+    return None
+
+
+def get_tvdb_token(api_key: str, rejected: Optional[str] = None) -> Optional[str]:
+    """
+    Gets a TheTVDB bearer token, logging in only when needed.
+
+    Tokens are valid for about a month: they are kept in memory and in a file
+    of the cache directory (mode 0600) and re-used by every process until
+    TVDB_TOKEN_TTL seconds after the login. Logins are serialized across
+    threads and processes, and whoever waited re-uses the token just issued.
+
+    :param api_key: API key for TheTVDB.
+    :param rejected: Token the API just refused (HTTP 401), to force a new login.
+    :return: Bearer token or None if the login fails.
+    """
+    global _TOKEN
+
+    cached = _TOKEN
+    if cached and cached[0] != rejected and _is_fresh(cached[1]):
+        return cached[0]
+
+    with _LOCK, _file_lock():
+        # Another thread or process may have logged in while we waited
+        for cached in (_TOKEN, _read_token(api_key)):
+            if cached and cached[0] != rejected and _is_fresh(cached[1]):
+                _TOKEN = cached
+                return cached[0]
+
+        issued_at = time.time()
+        token = _login(api_key)
+        if not token:
+            return None
+        _TOKEN = (token, issued_at)
+        _write_token(api_key, token, issued_at)
+        return token
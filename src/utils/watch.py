@@ -0,0 +1,277 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from src.utils.scanner import (
+    DEFAULT_VIDEO_EXTENSIONS,
+    is_video_file,
+    walk_video_folders,
+)
+
+# inotify(7) event flags
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (
+    IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+)
+_EVENT_HEADER = struct.Struct("iIII")
+
+# (size, mtime_ns) of a file, used to tell when it stops changing
+_Signature = Tuple[int, int]
+
+
+class _Inotify:
+    """
+    Minimal inotify binding through ctypes (Linux only).
+    """
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self._paths: Dict[int, str] = {}
+
+    def add_watch(self, path: str) -> None:
+        """
+        Watches a folder (not recursive).
+
+        :param path: Path of the folder
+        """
+        wd = self._add_watch(self._fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), path)
+        self._paths[wd] = path
+
+    def read_events(self, timeout: float) -> List[Tuple[str, int]]:
+        """
+        Waits up to timeout seconds and returns the pending events.
+
+        :param timeout: Maximum seconds to wait
+        :return: List of (path, mask); the path is empty on queue overflow
+        """
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return []
+
+        try:
+            buffer = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset < len(buffer):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(buffer, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(buffer[offset : offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                events.append(("", mask))
+                continue
+            folder = self._paths.get(wd)
+            if mask & IN_IGNORED:
+                self._paths.pop(wd, None)
+                continue
+            if folder is not None:
+                events.append((os.path.join(folder, name) if name else folder, mask))
+        return events
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class FolderWatcher:
+    """
+    Watches a folder tree and yields video files once they finished being written.
+
+    A file is considered complete when its size and modification time did not
+    change for settle_seconds. Files already present when the watcher starts are
+    yielded in the first batch (as soon as they are settled), so nothing that
+    landed while miaubot was not running is missed.
+
+    Changes are picked up through inotify on Linux; elsewhere, or if inotify
+    cannot be used (e.g. the watch limit was reached), the tree is rescanned
+    every poll_interval seconds.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        extensions: Iterable[str] = DEFAULT_VIDEO_EXTENSIONS,
+        exclude: Sequence[str] = (),
+        settle_seconds: float = 15.0,
+        poll_interval: float = 5.0,
+    ):
+        """
+        :param directory: Path of the folder to watch
+        :param extensions: File extensions to watch (e.g. (".mkv", ".mp4"))
+        :param exclude: Glob patterns of files or folders to skip (as in scan_video_files)
+        :param settle_seconds: Seconds a file must stay unchanged to be yielded
+        :param poll_interval: Seconds between checks (and between rescans when polling)
+        """
+        self.directory = directory
+        self.extensions = tuple(extensions)
+        self.exclude = tuple(exclude)
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        # Files waiting to settle: path -> (signature, monotonic time of last change)
+        self._pending: Dict[str, Tuple[_Signature, float]] = {}
+        # Files already yielded, so unchanged ones are not yielded again
+        self._done: Dict[str, _Signature] = {}
+        self._inotify: Optional[_Inotify] = None
+
+        try:
+            self._inotify = _Inotify()
+        except (OSError, AttributeError) as e:
+            print(f"inotify is not available ({e}), polling every {poll_interval}s")
+
+    def _is_wanted(self, path: str) -> bool:
+        """
+        Checks a file path against the extensions and exclude patterns.
+
+        :param path: Full path of the file
+        :return: True if the file should be processed
+        """
+        return is_video_file(self.directory, path, self.extensions, self.exclude)
+
+    def _add_tree(self, top: str, since: Optional[float] = None) -> None:
+        """
+        Watches a folder and its subfolders and queues their video files.
+
+        :param top: Folder to add
+        :param since: Monotonic time of the last change (None to derive it from mtime)
+        """
+        for folder, files in walk_video_folders(
+            self.directory, self.extensions, self.exclude, top=top
+        ):
+            if self._inotify is not None:
+                try:
+                    self._inotify.add_watch(folder)
+                except OSError as e:
+                    print(f"Cannot watch {folder} ({e}), falling back to polling")
+                    self._inotify.close()
+                    self._inotify = None
+            for path in files:
+                self._touch(path, since)
+
+    def _touch(self, path: str, since: Optional[float] = None) -> None:
+        """
+        Queues a file that may have changed.
+
+        :param path: Full path of the file
+        :param since: Monotonic time of the change (None to derive it from mtime)
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self._pending.pop(path, None)
+            return
+
+        signature = (stat.st_size, stat.st_mtime_ns)
+        if self._done.get(path) == signature:
+            return
+        previous = self._pending.get(path)
+        if previous and previous[0] == signature and since is None:
+            return
+
+        if since is None:
+            # Files found by a scan count as unchanged since their mtime
+            since = time.monotonic() - max(0.0, time.time() - stat.st_mtime)
+        self._pending[path] = (signature, since)
+
+    def _handle_events(self, events: List[Tuple[str, int]]) -> None:
+        """
+        Applies inotify events to the queue of files waiting to settle.
+
+        :param events: List of (path, mask) from _Inotify.read_events
+        """
+        now = time.monotonic()
+        for path, mask in events:
+            if not path:
+                # Events were dropped by the kernel: rescan to catch up
+                self._add_tree(self.directory)
+            elif mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self._add_tree(path)
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                self._pending.pop(path, None)
+                self._done.pop(path, None)
+            elif path in self._pending:
+                # Still being written: only push its deadline back, no stat()
+                self._pending[path] = (self._pending[path][0], now)
+            elif self._is_wanted(path):
+                self._touch(path, now)
+
+    def _collect_settled(self) -> List[str]:
+        """
+        Re-checks the queued files and takes out the ones that stopped changing.
+
+        :return: Paths of the settled files, in path order
+        """
+        now = time.monotonic()
+        settled = []
+        for path, (signature, since) in list(self._pending.items()):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                del self._pending[path]
+                continue
+
+            current = (stat.st_size, stat.st_mtime_ns)
+            if current != signature:
+                self._pending[path] = (current, now)
+            elif now - since >= self.settle_seconds:
+                del self._pending[path]
+                self._done[path] = signature
+                settled.append(path)
+        return sorted(settled)
+
+    def batches(self) -> Iterator[List[str]]:
+        """
+        Yields batches of settled files until interrupted (KeyboardInterrupt).
+
+        :return: Iterator of non-empty lists of file paths
+        """
+        self._add_tree(self.directory)
+        try:
+            while True:
+                settled = self._collect_settled()
+                if settled:
+                    yield settled
+
+                if self._pending:
+                    timeout = min(self.poll_interval, self.settle_seconds)
+                else:
+                    timeout = self.poll_interval
+
+                if self._inotify is not None:
+                    self._handle_events(self._inotify.read_events(timeout))
+                else:
+                    time.sleep(timeout)
+                    self._add_tree(self.directory)
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
@@ -0,0 +1,229 @@
+"""
+Throughput benchmark for the filename parser (src/utils/file_info.py).
+
+Generates a synthetic library with every supported naming format plus junk
+names, then reports parses/second for get_file_info, parse_many and
+_detect_platform, and the memory retained per parsed record.
+
+parse_many is also checked against the original single-file parser
+(tests/file_info_reference.py) on the same corpus: any difference is
+printed and the benchmark exits with status 1.
+
+Usage:
+    python -m tests.bench_file_info --size 100000 --quality-blocks 8
+"""
+
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, List
+
+from src.utils.file_info import (
+    FileInfoParser,
+    _detect_platform,
+    get_file_info,
+    parse_many,
+)
+from tests.file_info_reference import reference_file_info
+
+TITLES = [
+    "Captivated, by You",
+    "Re:Zero - Starting Life in Another World",
+    "Spy x Family",
+    "The Apothecary Diaries",
+    "Frieren - Beyond Journey's End",
+    "Oshi no Ko",
+]
+SOURCES = [
+    "CR WEB-DL",
+    "AMZN WEB-DL",
+    "NF WEBRip",
+    "DSNP WEB-DL",
+    "WEBRip",
+    "BluRay",
+    "BD",
+    "",
+]
+RESOLUTIONS = ["480p", "720p", "1080p", "2160p"]
+EXTRA_BLOCKS = [
+    "[8bit]",
+    "[10bit]",
+    "[HDR]",
+    "[8.2 Mbps]",
+    "[AVC]",
+    "[HEVC]",
+    "[AAC 2.0]",
+    "[E-AC-3 5.1]",
+    "[ja]",
+    "[es-419, en]",
+]
+GROUPS = ["Erai-raws", "SubsPlease", "VARYG", "Tsundere-Raws"]
+
+
+def _quality_block(rng: random.Random, extra_blocks: int) -> str:
+    """
+    Builds a quality block such as "[1080p CR WEB-DL] [8bit] [AVC] [AAC 2.0]".
+
+    :param rng: Random generator
+    :param extra_blocks: Number of bracketed blocks after the resolution block
+    :return: Quality block string
+    """
+    head = f"[{rng.choice(RESOLUTIONS)} {rng.choice(SOURCES)}]".replace(" ]", "]")
+    extras = [rng.choice(EXTRA_BLOCKS) for _ in range(extra_blocks)]
+    return " ".join([head, *extras])
+
+
+def generate_corpus(size: int, quality_blocks: int = 5, seed: int = 42) -> List[str]:
+    """
+    Generates a synthetic list of file paths with a realistic mix of formats.
+
+    :param size: Number of paths to generate
+    :param quality_blocks: Number of extra bracketed blocks in quality strings
+    :param seed: Random seed, so runs are comparable
+    :return: List of file paths
+    """
+    rng = random.Random(seed)
+    paths = []
+
+    for index in range(size):
+        title = rng.choice(TITLES)
+        year = rng.randint(1990, 2025)
+        quality = _quality_block(rng, quality_blocks)
+        group = rng.choice(GROUPS)
+        kind = rng.random()
+        tvdb_id = 100000 + index % 5000
+        series_folder = f"/media/shows/Anime/{title} ({year}) [tvdbid-{tvdb_id}]"
+        season = rng.randint(1, 5)
+        episode = rng.randint(1, 24)
+        absolute = episode + 24 * (season - 1)
+
+        if kind < 0.55:
+            # New anime format
+            paths.append(
+                f"{series_folder}/Season {season:02d}/{title} ({year}) - "
+                f"S{season:02d}E{episode:02d} - {absolute:03d} - {quality} - {group}.mkv"
+            )
+        elif kind < 0.70:
+            # Multi-episode range
+            paths.append(
+                f"{series_folder}/Season {season:02d}/{title} ({year}) - "
+                f"S{season:02d}E{episode:02d}-E{episode + 2:02d} - "
+                f"{absolute:03d}-{absolute + 2:03d} - {quality} - {group}.mkv"
+            )
+        elif kind < 0.85:
+            # Extended movie format
+            movie = f"{title} ({year}) [tmdbid-{tvdb_id}]"
+            paths.append(f"/media/movies/{movie}/{movie} - {quality} - {group}.mkv")
+        elif kind < 0.95:
+            # Old format
+            resolution = rng.choice(RESOLUTIONS)
+            platform = rng.choice(["CR", "AMZN", "NF", "BD"])
+            paths.append(
+                f"/media/old/{title} ({year}) - S{season:02d}E{episode:02d} - "
+                f"[{resolution}] [{platform}] [tvdbid={tvdb_id}].mp4"
+            )
+        else:
+            # Non-matching junk that still looks close to the patterns
+            paths.append(
+                f"/media/incoming/{title}.{year}.S{season:02d}E{episode:02d}."
+                f"{quality.replace(' ', '.')}-{group}.mkv"
+            )
+
+    return paths
+
+
+def _measure(label: str, count: int, run: Callable[[], object]) -> object:
+    """
+    Runs a callable once and prints its throughput.
+
+    :param label: Name shown in the report
+    :param count: Number of items processed by the callable
+    :param run: Callable to time
+    :return: Whatever the callable returned
+    """
+    start = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {count / elapsed:>14,.0f} /s {elapsed:>10.3f} s")
+    return result
+
+
+def check_parity(paths: List[str], limit: int = 10) -> int:
+    """
+    Compares parse_many with the original parser on every path.
+
+    :param paths: File paths to parse
+    :param limit: Number of mismatches printed
+    :return: Number of paths parsed differently
+    """
+    mismatches = 0
+    for path, result in zip(paths, parse_many(paths)):
+        expected = reference_file_info(path)
+        actual = result.to_dict() if result is not None else None
+        if actual != expected:
+            mismatches += 1
+            if mismatches <= limit:
+                print(
+                    f"Mismatch for {path}:\n  expected {expected}\n  got      {actual}"
+                )
+    return mismatches
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the filename parser.")
+    parser.add_argument("--size", type=int, default=100000, help="Corpus size")
+    parser.add_argument(
+        "--quality-blocks",
+        type=int,
+        default=5,
+        help="Extra bracketed blocks per quality string (raise to probe backtracking)",
+    )
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+
+    paths = generate_corpus(args.size, args.quality_blocks, args.seed)
+    rng = random.Random(args.seed)
+    quality_strings = [
+        _quality_block(rng, args.quality_blocks) for _ in range(args.size)
+    ]
+
+    print(f"Corpus: {len(paths)} paths, {args.quality_blocks} extra quality blocks")
+    _measure(
+        "get_file_info",
+        len(paths),
+        lambda: [get_file_info(path) for path in paths],
+    )
+    _measure("parse_many", len(paths), lambda: parse_many(paths))
+    _measure(
+        "parse_many (cold parser)",
+        len(paths),
+        lambda: FileInfoParser().parse_many(paths),
+    )
+    _measure(
+        "_detect_platform",
+        len(quality_strings),
+        lambda: [_detect_platform(quality) for quality in quality_strings],
+    )
+
+    # Memory retained by the parsed records
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    results = FileInfoParser().parse_many(paths)
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    matched = sum(1 for result in results if result is not None)
+    print(f"Matched: {matched}/{len(paths)}")
+    print(f"Memory per record: {(after - before) / max(matched, 1):,.0f} bytes")
+    print(f"Peak while parsing: {(peak - before) / 1024 / 1024:,.1f} MiB")
+
+    mismatches = check_parity(paths)
+    print(f"Parity with the original parser: {mismatches} mismatches")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Startup benchmark for the CLI (src/main.py).
+
+FileBot starts miaubot once per episode, so the cost of getting to main() is
+paid on every file. Each measurement runs in a fresh interpreter:
+
+- the time to import src.main, and which heavy modules it pulled in
+  (none of HEAVY_MODULES should be loaded before main() needs them)
+- the wall time of whole invocations that exit early (--help, a missing path)
+
+Exits with status 1 if a heavy module is imported eagerly or the median
+import time is above --max-import-ms, so it can guard changes in CI.
+
+Usage:
+    python -m tests.bench_startup --runs 20 --max-import-ms 50
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import List
+
+# Modules that only some code paths need and that are slow to load
+HEAVY_MODULES = (
+    "requests",
+    "urllib3",
+    "pymediainfo",
+    "dotenv",
+    "sqlite3",
+    "multiprocessing",
+    "cProfile",
+    "src.config",
+)
+
+_IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import src.main
+elapsed = time.perf_counter() - start
+print(json.dumps({"ms": elapsed * 1000, "modules": sorted(sys.modules)}))
+"""
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _measure_import(runs: int) -> tuple:
+    """
+    Imports src.main in fresh interpreters.
+
+    :param runs: Number of interpreters to start
+    :return: Tuple (import times in ms, heavy modules loaded by the import)
+    """
+    times = []
+    loaded = set()
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", _IMPORT_PROBE],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        times.append(result["ms"])
+        loaded.update(name for name in HEAVY_MODULES if name in result["modules"])
+    return times, sorted(loaded)
+
+
+def _measure_command(runs: int, arguments: List[str]) -> List[float]:
+    """
+    Runs miaubot.py end to end in fresh interpreters.
+
+    :param runs: Number of runs
+    :param arguments: Command line arguments for miaubot.py
+    :return: Wall times in ms
+    """
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "miaubot.py", *arguments],
+            cwd=PROJECT_ROOT,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def _print_times(label: str, times: List[float]) -> None:
+    """
+    Prints the median and spread of a measurement.
+
+    :param label: Name shown in the report
+    :param times: Times in ms
+    """
+    print(
+        f"{label:<28} median {statistics.median(times):>8.1f} ms "
+        f"min {min(times):>8.1f} ms max {max(times):>8.1f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the CLI startup.")
+    parser.add_argument("--runs", type=int, default=10, help="Runs per measurement")
+    parser.add_argument(
+        "--max-import-ms",
+        type=float,
+        default=None,
+        help="Fail if the median import time of src.main is above this",
+    )
+    args = parser.parse_args()
+
+    import_times, loaded = _measure_import(args.runs)
+    _print_times("import src.main", import_times)
+    _print_times("miaubot.py --help", _measure_command(args.runs, ["--help"]))
+    _print_times(
+        "miaubot.py (missing path)",
+        _measure_command(args.runs, ["--input", "/nonexistent", "--dry-run"]),
+    )
+
+    failed = False
+    if loaded:
+        print(f"Heavy modules imported by src.main: {', '.join(loaded)}")
+        failed = True
+    else:
+        print("No heavy modules imported by src.main")
+
+    median = statistics.median(import_times)
+    if args.max_import_ms is not None and median > args.max_import_ms:
+        print(f"Import time {median:.1f} ms is above {args.max_import_ms:.1f} ms")
+        failed = True
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from src.utils import media_cache
+
+
+class LastUsedTest(unittest.TestCase):
+    def setUp(self):
+        self.connection = sqlite3.connect(":memory:")
+        self.connection.executescript(media_cache._SCHEMA)
+        self.addCleanup(self.connection.close)
+        patcher = mock.patch.object(
+            media_cache, "_get_connection", return_value=self.connection
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        handle, self.path = tempfile.mkstemp()
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+
+    def _last_used(self):
+        return self.connection.execute("SELECT last_used FROM media_info").fetchone()[0]
+
+    def _store_at(self, now):
+        with mock.patch.object(media_cache.time, "time", return_value=now):
+            media_cache.store_media_info(self.path, {"video": "h264"})
+
+    def _get_at(self, now):
+        with mock.patch.object(media_cache.time, "time", return_value=now):
+            return media_cache.get_cached_media_info(self.path)
+
+    def test_recent_hit_does_not_write(self):
+        self._store_at(1000.0)
+        self.assertEqual(self._get_at(1000.0 + 3600), {"video": "h264"})
+        self.assertEqual(self._last_used(), 1000.0)
+
+    def test_hit_after_a_day_refreshes_last_used(self):
+        self._store_at(1000.0)
+        later = 1000.0 + media_cache._TOUCH_INTERVAL
+        self.assertEqual(self._get_at(later), {"video": "h264"})
+        self.assertEqual(self._last_used(), later)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import os
+import tempfile
+import unittest
+
+from src.utils.media_info import _BudgetedReader
+
+
+class BudgetedReaderTest(unittest.TestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp()
+        with os.fdopen(handle, "wb") as f:
+            f.write(b"x" * 1000)
+        self.raw = open(self.path, "rb", buffering=0)
+        self.addCleanup(os.remove, self.path)
+        self.addCleanup(self.raw.close)
+
+    def test_reads_stop_at_the_budget(self):
+        reader = _BudgetedReader(self.raw, 100)
+        self.assertEqual(len(reader.read(60)), 60)
+        self.assertEqual(len(reader.read()), 40)
+        self.assertFalse(reader.exhausted)
+        self.assertEqual(reader.read(10), b"")
+        self.assertTrue(reader.exhausted)
+
+    def test_whole_file_within_budget_is_not_exhausted(self):
+        reader = _BudgetedReader(self.raw, 2000)
+        self.assertEqual(len(reader.read()), 1000)
+        self.assertEqual(reader.read(), b"")
+        self.assertFalse(reader.exhausted)
+
+    def test_exhausted_stays_set_after_seeking_to_the_end(self):
+        reader = _BudgetedReader(self.raw, 100)
+        reader.read(200)
+        self.assertEqual(reader.read(10), b"")
+        self.assertTrue(reader.exhausted)
+
+        reader.seek(0, os.SEEK_END)
+        self.assertEqual(reader.read(10), b"")
+        self.assertTrue(reader.exhausted)
+
+
+if __name__ == "__main__":
+    unittest.main()